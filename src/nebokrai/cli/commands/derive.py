@@ -22,7 +22,7 @@ def derive_dryrun_accept() -> None:
 def derive_plan() -> None:
     print("running 'nebokrai derive plan'")
     nbkr = NebokraiEntryPoint()
-    nbkr.derive_plan()
+    nbkr.derive_plan(cache=True)
     nbkr.save_plan()
 
 
@@ -30,5 +30,4 @@ def derive_schedules() -> None:
     print("running 'nebokrai derive schedule'")
     nbkr = NebokraiEntryPoint()
     nbkr.open_plan()
-    nbkr.derive_schedules()
-    nbkr.save_schedules()
+    nbkr.save_schedules(nbkr.derive_schedules_iter())
@@ -22,6 +22,7 @@ class PathManager:
         self.backup_dir = self.root / "backup"
         self.tmp_dir = self.root / "tmp"
         self.tracking_dir = self.root / "tracking"
+        self.cache_dir = self.root / "cache"
 
         self.calendar = self.declaration_dir / "calendar.json"
         self.config = self.declaration_dir / "config.json"
@@ -40,6 +41,8 @@ class PathManager:
 
         self.tracking_store = self.tracking_dir / "tracking_store.json"
 
+        self.subplan_cache_dir = self.cache_dir / "subplans"
+
     def backup(self, backup_name: str) -> Path:
         """
         Generates a path to a backup file ensuring that the backups folder exists.
@@ -110,6 +113,7 @@ class PathManager:
                 f"txt_dir:            {self.txt_dir}",
                 f"log_dir:            {self.log_dir}",
                 f"tracking_dir:       {self.tracking_dir}",
+                f"cache_dir:          {self.cache_dir}",
                 single_bar,
                 f"calendar:           {self.calendar}",
                 f"config:             {self.config}",
@@ -125,6 +129,7 @@ class PathManager:
                 f"txt_gantt:          {self.txt_gantt}",
                 single_bar,
                 f"tracking_store:     {self.tracking_store}",
+                f"subplan_cache_dir:  {self.subplan_cache_dir}",
                 double_bar,
             )
         )
@@ -15,12 +15,15 @@
 # from .container import Entries, Projects, Roadmaps, Routines, Schedules, Tasks
 
 from .base.calendar import Calendar, Day
+from .base.dependency_graph import DependencyGraph, PrecedenceViolation
 from .base.entry import Empty, Entry
-from .base.plan import Plan, update_plan
+from .base.occupancy import Occupancy
+from .base.plan import Plan, sweep_plan, update_plan
 from .base.project import Project
 from .base.roadmap import Roadmap
 from .base.routine import Routine
-from .base.schedule import Schedule, add_from_plan_and_excess
+from .base.schedule import Schedule, add_from_plan_and_excess, derive_base_schedule
+from .base.subplan_cache import SubplanCache
 from .base.task import Task
 from .container.entries import Entries
 from .container.projects import Projects
@@ -32,10 +35,13 @@ from .container.tasks import Tasks
 __all__ = [
     "Calendar",
     "Day",
+    "DependencyGraph",
     "Empty",
     "Entry",
     "Entries",
+    "Occupancy",
     "Plan",
+    "PrecedenceViolation",
     "Project",
     "Projects",
     "Roadmap",
@@ -44,8 +50,11 @@ __all__ = [
     "Routines",
     "Schedule",
     "Schedules",
+    "SubplanCache",
     "Task",
     "Tasks",
     "add_from_plan_and_excess",
+    "derive_base_schedule",
+    "sweep_plan",
     "update_plan",
 ]
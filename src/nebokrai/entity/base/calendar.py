@@ -1,11 +1,14 @@
-from typing import Any, Iterable, Iterator, Union
+from collections import OrderedDict
+from itertools import chain
+from typing import Any, Iterable, Iterator, Optional, Union, cast
 
 from ...configuration import config
-from ...util import NKDate, tabularize
-from ...util.nkdatetime.nktime import NKTime
+from ...util import DateSet, NKDate, RecurrenceRule, tabularize
+from ...util.nkdatetime.nktime import END_OF_DAY, MIDNIGHT, NKTime
 from ...util.serde.custom_dict_types import (
     CalendarDictRaw,
     DayDictRaw,
+    RecurringDaysDictRaw,
     RoutinesInCalendarDictRaw,
 )
 from ..container.entries import Entries
@@ -39,11 +42,11 @@ class Day:
             min(end, self.routines.end),
             self.entries.end,
         )
-        morning_normaltime = NKTime(0).timeto(waketime)
-        evening_normaltime = bedtime.timeto(NKTime(24))
+        morning_normaltime = MIDNIGHT.timeto(waketime)
+        evening_normaltime = bedtime.timeto(END_OF_DAY)
         morning_sleep = Entry(
             "Sleep",
-            NKTime(0),
+            MIDNIGHT,
             end=waketime,
             priority=config.default_sleep_priority,
             normaltime=morning_normaltime,
@@ -55,7 +58,7 @@ class Day:
         evening_sleep = Entry(
             "Sleep",
             bedtime,
-            end=NKTime(24),
+            end=END_OF_DAY,
             priority=config.default_sleep_priority,
             normaltime=evening_normaltime,
             idealtime=evening_normaltime,
@@ -125,36 +128,7 @@ class Day:
         """
         Creates routine entries from the declaration and from the Routines instance.
         """
-
-        entries = Entries()
-
-        for routine_spec in routines_dict.values():
-            routine_name = routine_spec["name"]
-
-            routine_entry = routines[routine_name].as_entry(
-                start=NKTime.from_string(
-                    routine_spec.get("start") or str(routines[routine_name].start)
-                ),
-                priority=int(routine_spec.get("priority") or routines[routine_name].priority),
-                normaltime=int(routine_spec.get("normaltime") or routines[routine_name].normaltime),
-                idealtime=int(routine_spec.get("idealtime") or routines[routine_name].idealtime),
-                mintime=int(routine_spec.get("mintime") or routines[routine_name].mintime),
-                maxtime=int(routine_spec.get("maxtime") or routines[routine_name].maxtime),
-                ismovable=bool(
-                    routine_spec.get("ismovable")
-                    if routine_spec.get("ismovable") is not None
-                    else routines[routine_name].ismovable
-                ),
-                order=float(
-                    routine_spec["order"]
-                    if "order" in routine_spec
-                    else routines[routine_name].order
-                ),
-            )
-
-            entries.append(routine_entry)
-
-        return entries
+        return Entries(map(routines.routine_entry, routines_dict.values()))
 
     @property
     def routine_names(self) -> list[str]:
@@ -195,7 +169,7 @@ class Day:
         time_dict: dict[str, int] = {}
         time_dict.update({"empty": self.empty_time})
         time_dict.update({"total": self.total_available})
-        for block in self.blocks:
+        for block in sorted(self.blocks):
             time_dict.update({block: self.available_for_block(block)})
         return time_dict
 
@@ -222,53 +196,132 @@ class Day:
 
 class Calendar:
     """
-    Container for all days, with a few helper methods.
+    Container for all days, with a few helper methods. Days deserialized from the declaration
+      are only built on first access, and at most `max_live_days` of them are kept alive (least
+      recently used first out; evicted days are rebuilt from the declaration when accessed
+      again). Days passed in directly or added are always kept.
+
+    Besides explicit dates, the declaration may contain a list of 'recurring' days, each a day
+      declaration applying to the dates matching a recurrence rule (see `RecurrenceRule`).
+      Rules are compiled into date sets up front; explicit dates take precedence over rules,
+      and later rules over earlier ones.
     """
 
-    def __init__(self, days: Union[dict[NKDate, Day], Iterable[Day]]) -> None:
-        self.days: dict[NKDate, Day] = days if isinstance(days, dict) else {d.date: d for d in days}
+    def __init__(
+        self,
+        days: Union[dict[NKDate, Day], Iterable[Day]],
+        max_live_days: Optional[int] = 366,
+    ) -> None:
+        self._days: dict[NKDate, Day] = (
+            dict(days) if isinstance(days, dict) else {d.date: d for d in days}
+        )
+        self._day_dicts: dict[NKDate, DayDictRaw] = {}
+        self._recurring: list[tuple[DateSet, DayDictRaw]] = []
+        self._live_days: OrderedDict[NKDate, Day] = OrderedDict()
+        self._routines: Optional[Routines] = None
+        self.max_live_days = max_live_days
 
     @classmethod
     def deserialize(cls, routines: Routines, calendar_dict: CalendarDictRaw) -> "Calendar":
         """
-        Creates instance from dict, intended to be used with .json declaration format.
+        Creates instance from dict, intended to be used with .json declaration format. The days
+          themselves are deserialized lazily.
         """
-        days = {}
-        for date_string, day_dict in calendar_dict.items():
-            day_date = NKDate.from_string(date_string)
-            day = Day.deserialize(routines, day_date, day_dict)
-            days.update({day_date: day})
-
-        return cls(days)
+        calendar = cls({})
+        calendar._routines = routines
+        calendar._day_dicts = {
+            NKDate.from_string(date_string): cast(DayDictRaw, day_dict)
+            for date_string, day_dict in calendar_dict.items()
+            if date_string != "recurring"
+        }
+        recurring = cast(list[RecurringDaysDictRaw], calendar_dict.get("recurring", []))
+        calendar._recurring = [
+            (RecurrenceRule.deserialize(rule_dict).compile(), rule_dict["day"])
+            for rule_dict in recurring
+        ]
+        if calendar._day_dicts or any(dates for dates, _ in calendar._recurring):
+            for routine in routines:
+                routine.compile_valid_dates(calendar.start_date, calendar.end_date)
+        return calendar
 
     def copy(self) -> "Calendar":
-        cal = Calendar({})
-        cal.days = {k.copy(): v.copy() for k, v in self.days.items()}
+        cal = Calendar({k.copy(): v.copy() for k, v in self._days.items()}, self.max_live_days)
+        cal._day_dicts = dict(self._day_dicts)
+        cal._recurring = list(self._recurring)
+        cal._routines = self._routines
+        cal._live_days = OrderedDict((k.copy(), v.copy()) for k, v in self._live_days.items())
         return cal
 
     def add(self, day: Day) -> None:
-        self.days.update({day.date: day})
+        self._days.update({day.date: day})
+        self._live_days.pop(day.date, None)
+
+    @property
+    def days(self) -> dict[NKDate, Day]:
+        """
+        All days, built as necessary.
+        """
+        return {date: self[date] for date in self}
 
     @property
     def start_date(self) -> NKDate:
-        return min(self.days)
+        recurring = (dates.start for dates, _ in self._recurring if dates)
+        return min(chain(self._days, self._day_dicts, recurring))  # type: ignore
 
     @property
     def end_date(self) -> NKDate:
-        return max(self.days)
+        recurring = (dates.end for dates, _ in self._recurring if dates)
+        return max(chain(self._days, self._day_dicts, recurring))  # type: ignore
+
+    def day_dict(self, date: NKDate) -> DayDictRaw:
+        """
+        Returns the declaration of the given date, explicit or from the last matching recurrence
+          rule. Raises a KeyError if there is none.
+        """
+        if date in self._day_dicts:
+            return self._day_dicts[date]
+        for dates, day_dict in reversed(self._recurring):
+            if date in dates:
+                return day_dict
+        raise KeyError(date)
 
     def long_repr(self) -> str:
         spacer = tabularize(" ", config.repr_width, thick=True) + "\n"
-        return spacer.join(map(str, self.days.values()))
+        return spacer.join(map(lambda date: str(self[date]), self))
 
     def __getitem__(self, __date: NKDate) -> Day:
-        return self.days[__date]
+        if __date in self._days:
+            return self._days[__date]
+        if __date in self._live_days:
+            self._live_days.move_to_end(__date)
+            return self._live_days[__date]
+        day_dict = self.day_dict(__date)
+        assert self._routines is not None
+        day = Day.deserialize(self._routines, __date, day_dict)
+        self._live_days[__date] = day
+        if self.max_live_days is not None and len(self._live_days) > self.max_live_days:
+            self._live_days.popitem(last=False)
+        return day
 
     def __setitem__(self, __name: NKDate, __value: Any) -> None:
         ...
 
+    def __contains__(self, __date: NKDate) -> bool:
+        if __date in self._days or __date in self._day_dicts:
+            return True
+        return any(__date in dates for dates, _ in self._recurring)
+
     def __iter__(self) -> Iterator[NKDate]:
-        return iter(self.days.keys())
+        """
+        Iterates over the explicit dates (in declaration order), then over the dates only
+          covered by recurrence rules (in ascending order).
+        """
+        explicit = dict.fromkeys(chain(self._day_dicts, self._days))
+        recurring = {d for dates, _ in self._recurring for d in dates if d not in explicit}
+        return chain(explicit, sorted(recurring))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
 
     @property
     def summary(self) -> str:
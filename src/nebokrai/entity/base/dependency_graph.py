@@ -0,0 +1,256 @@
+import heapq
+from collections import deque
+from itertools import chain
+from typing import Iterable, NamedTuple, Optional, Union
+
+from ...util import NKDate, ProjectID, TaskID
+from ..container.projects import Projects
+from .plan import Plan
+
+DependencyID = Union[TaskID, ProjectID]
+
+
+class PrecedenceViolation(NamedTuple):
+    """
+    A task planned on or before the (last) date of one of its dependencies.
+    """
+
+    task_id: TaskID
+    date: NKDate
+    dependency: DependencyID
+    earliest: NKDate
+
+    def __str__(self) -> str:
+        return (
+            f"Task {'<>'.join(self.task_id)} assigned to {self.date}, "
+            f"but earliest permissible date is {self.earliest} "
+            f"(limiting dependency: {self.dependency})."
+        )
+
+
+class DependencyGraph:
+    """
+    Directed graph of the dependencies between the tasks of a set of projects. Dependencies on a
+      whole project are represented by a single node for that project, which depends on all of
+      its tasks, so that the graph has O(V+E) size regardless of project sizes.
+    """
+
+    def __init__(self, projects: Projects) -> None:
+        self._project_tasks: dict[ProjectID, list[TaskID]] = {}
+        self._dependencies: dict[TaskID, list[DependencyID]] = {}
+        for task in projects.tasks.values():
+            self._project_tasks.setdefault(task.task_id.project_id, []).append(task.task_id)
+            self._dependencies[task.task_id] = sorted(task.dependencies)
+
+        nodes: Iterable[DependencyID] = chain(self._project_tasks, self._dependencies)
+        self._successors: dict[DependencyID, list[DependencyID]] = {node: [] for node in nodes}
+        for task_id, dependencies in self._dependencies.items():
+            for dependency in dependencies:
+                if dependency not in self._successors:
+                    raise ValueError(f"Task {task_id} depends on unknown id: {dependency}.")
+                self._successors[dependency].append(task_id)
+        for project_id, task_ids in self._project_tasks.items():
+            for task_id in task_ids:
+                self._successors[task_id].append(project_id)
+        self._rank: Optional[dict[TaskID, int]] = None
+
+    @property
+    def task_ids(self) -> list[TaskID]:
+        return list(self._dependencies)
+
+    def dependencies(self, task_id: TaskID) -> list[DependencyID]:
+        return self._dependencies[task_id]
+
+    def find_cycle(self) -> Optional[list[DependencyID]]:
+        """
+        Returns a list of nodes forming a dependency cycle (first node repeated at the end), or
+          None if the graph is acyclic. Uses an iterative depth-first search.
+        """
+        unvisited, active, done = 0, 1, 2
+        state: dict[DependencyID, int] = dict.fromkeys(self._successors, unvisited)
+        for root in self._successors:
+            if state[root] != unvisited:
+                continue
+            path: list[DependencyID] = [root]
+            stack = [iter(self._successors[root])]
+            state[root] = active
+            while stack:
+                node = next(stack[-1], None)
+                if node is None:
+                    stack.pop()
+                    state[path.pop()] = done
+                elif state[node] == active:
+                    return path[path.index(node) :] + [node]
+                elif state[node] == unvisited:
+                    state[node] = active
+                    path.append(node)
+                    stack.append(iter(self._successors[node]))
+        return None
+
+    def topological_order(self) -> list[TaskID]:
+        """
+        Returns all task ids such that every task comes after all of its dependencies (Kahn's
+          algorithm, stable with respect to the order of the projects' tasks). Raises a
+          ValueError naming a cycle if there is one.
+        """
+        indegree: dict[DependencyID, int] = dict.fromkeys(self._successors, 0)
+        for successors in self._successors.values():
+            for node in successors:
+                indegree[node] += 1
+
+        queue = deque(node for node, degree in indegree.items() if not degree)
+        order: list[TaskID] = []
+        while queue:
+            node = queue.popleft()
+            if isinstance(node, TaskID):
+                order.append(node)
+            for successor in self._successors[node]:
+                indegree[successor] -= 1
+                if not indegree[successor]:
+                    queue.append(successor)
+
+        if len(order) < len(self._dependencies):
+            cycle = self.find_cycle() or []
+            raise ValueError(f"Dependency cycle: {' -> '.join(map(str, cycle))}.")
+        return order
+
+    @property
+    def rank(self) -> dict[TaskID, int]:
+        """
+        Position of each task in the topological order (computed once).
+        """
+        if self._rank is None:
+            self._rank = {task_id: i for i, task_id in enumerate(self.topological_order())}
+        return self._rank
+
+    def project_order(self, project_ids: list[ProjectID]) -> list[ProjectID]:
+        """
+        Orders projects such that every project comes after the projects its tasks depend on,
+          otherwise keeping the given order (e.g. by priority). Raises a ValueError if projects
+          depend on each other mutually, since they then cannot be planned one after the other.
+        """
+        position = {project_id: i for i, project_id in enumerate(project_ids)}
+        successors: dict[ProjectID, set[ProjectID]] = {project_id: set() for project_id in position}
+        for task_id, dependencies in self._dependencies.items():
+            for dependency in dependencies:
+                if isinstance(dependency, TaskID):
+                    dependency = dependency.project_id
+                if dependency in position and task_id.project_id in position:
+                    if dependency != task_id.project_id:
+                        successors[dependency].add(task_id.project_id)
+
+        indegree = dict.fromkeys(position, 0)
+        for targets in successors.values():
+            for project_id in targets:
+                indegree[project_id] += 1
+        heap = [(position[p], p) for p, degree in indegree.items() if not degree]
+        heapq.heapify(heap)
+        order: list[ProjectID] = []
+        while heap:
+            _, project_id = heapq.heappop(heap)
+            order.append(project_id)
+            for successor in successors[project_id]:
+                indegree[successor] -= 1
+                if not indegree[successor]:
+                    heapq.heappush(heap, (position[successor], successor))
+
+        if len(order) < len(position):
+            remaining = ", ".join(str(p) for p in position if p not in order)
+            raise ValueError(f"Projects depend on each other and cannot be ordered: {remaining}.")
+        return order
+
+    def dependency_date(self, plan: Plan, dependency: DependencyID) -> Optional[NKDate]:
+        """
+        Returns the date on which a dependency is fulfilled: the date of a task, or the date of
+          the last task of a project once all of them are planned. None if it is not (yet).
+        """
+        if isinstance(dependency, ProjectID):
+            nplanned, latest = plan.project_dates(dependency)
+            return latest if nplanned == len(self._project_tasks[dependency]) else None
+        return planned_date(plan, dependency)
+
+    def permits(self, plan: Plan, task_id: TaskID, date: NKDate) -> bool:
+        """
+        Checks whether a task may be placed on the given date, i.e. whether all its dependencies
+          are planned on earlier dates.
+        """
+        for dependency in self._dependencies.get(task_id, []):
+            dependency_date = self.dependency_date(plan, dependency)
+            if dependency_date is None or dependency_date >= date:
+                return False
+        return True
+
+    def assert_satisfiable(self, plan: Plan, task_ids: Iterable[TaskID]) -> None:
+        """
+        Raises a ValueError naming the dependency if one of the given tasks depends on a task
+          that is neither planned nor among the given tasks, since rolling the tasks over would
+          then never place them.
+        """
+        pending = set(task_ids)
+        for task_id in pending:
+            for dependency in self._dependencies.get(task_id, []):
+                if self.dependency_date(plan, dependency) is not None:
+                    continue
+                task_ids_ = (
+                    self._project_tasks[dependency]
+                    if isinstance(dependency, ProjectID)
+                    else [dependency]
+                )
+                for dependency_task_id in task_ids_:
+                    if dependency_task_id not in pending and (
+                        planned_date(plan, dependency_task_id) is None
+                    ):
+                        raise ValueError(
+                            f"Task {task_id} depends on {dependency}, but {dependency_task_id} "
+                            "is not planned, so the dependency can never be satisfied. Please "
+                            "check that its project is part of the declaration being planned."
+                        )
+
+    def is_pinned(self, plan: Plan, task_id: TaskID) -> bool:
+        """
+        Checks whether any task depending on the given task (directly or through its project) is
+          already planned, in which case the task must not be moved to a later date.
+        """
+        dependents = chain(self._successors[task_id], self._successors[task_id.project_id])
+        for dependent in dependents:
+            if isinstance(dependent, TaskID) and planned_date(plan, dependent) is not None:
+                return True
+        return False
+
+    @staticmethod
+    def latest_date(plan: Plan, project_id: ProjectID) -> Optional[NKDate]:
+        """
+        Returns the date of the last planned task of a project, or None if none is planned.
+        """
+        return plan.project_dates(project_id)[1]
+
+    def violations(self, plan: Plan) -> list[PrecedenceViolation]:
+        """
+        Checks every dependency of every planned task against the plan in O(V+E) and returns all
+          violations, ordered by task id and dependency.
+        """
+
+        def dependency_date(dependency: DependencyID) -> Optional[NKDate]:
+            if isinstance(dependency, ProjectID):
+                return self.latest_date(plan, dependency)
+            return planned_date(plan, dependency)
+
+        violations: list[PrecedenceViolation] = []
+        for task_id in sorted(self._dependencies):
+            if not (dependencies := self._dependencies[task_id]):
+                continue
+            if (date := planned_date(plan, task_id)) is None:
+                continue
+            for dependency in dependencies:
+                if (dep_date := dependency_date(dependency)) is None:
+                    continue
+                if date <= dep_date:
+                    violations.append(PrecedenceViolation(task_id, date, dependency, dep_date + 1))
+        return violations
+
+
+def planned_date(plan: Plan, task_id: TaskID) -> Optional[NKDate]:
+    try:
+        return plan.date_of(task_id)
+    except KeyError:
+        return None
@@ -1,7 +1,9 @@
+import heapq
 from typing import Iterable, Optional, Union
 
 from ...configuration import config
 from ...util import NKTime, round5, tabularize
+from ...util.nkdatetime.nktime import END_OF_DAY
 from ...util.serde.custom_dict_types import (
     EntryDictParsed,
     EntryDictRaw,
@@ -164,8 +166,8 @@ class Entry:
         """
         return Entry(
             "Last",
-            start=NKTime(24),
-            end=NKTime(24),
+            start=END_OF_DAY,
+            end=END_OF_DAY,
             ismovable=False,
             priority=-1.0,
             mintime=0,
@@ -189,6 +191,16 @@ class Entry:
             order=self.order,
         )
 
+    def shallow_copy(self) -> "Entry":
+        """
+        Returns a copy sharing all attribute values with self except for the list of subentries,
+          which is the only attribute mutated in place.
+        """
+        entry = object.__new__(type(self))
+        entry.__dict__.update(self.__dict__)
+        entry.subentries = list(self.subentries)
+        return entry
+
     @property
     def fullname(self) -> str:
         return f"{self.name} ({self.project_name})"
@@ -218,8 +230,18 @@ class Entry:
         Adds another entry to be part of self. Only works if self is a block,
           i.e. `self.blocks` is not empty.
         """
-        self.assert_subentry_category(subentry)
-        self.subentries.append(subentry)
+        return self.add_subentries([subentry])
+
+    def add_subentries(self, subentries: Iterable["Entry"]) -> list["Entry"]:
+        """
+        Adds several entries to be part of self at once, evicting the lowest-priority
+          subentries if they do not all fit and recomputing the subentry times once. Returns
+          the evicted subentries.
+        """
+        batch = list(subentries)
+        for subentry in batch:
+            self.assert_subentry_category(subentry)
+        self.subentries.extend(batch)
         excess = self.pop_low_prio_subentries()
         self.subentries.sort(key=lambda e: (e.order, -e.priority))
         self.adjust_subentry_times()
@@ -232,12 +254,22 @@ class Entry:
 
     def pop_low_prio_subentries(self) -> list["Entry"]:
         """
-        Handle case where subentry does not fit - pop lowest-priority
+        Handle case where subentries do not fit - pop lowest-priority (and, among equal
+          priorities, latest added) until the normal times of the rest fit.
         """
-        excess: list[Entry] = []
-        self.subentries.sort(key=lambda e: -e.priority)
-        while sum(map(lambda se: se.duration, self.subentries)) > self.duration:
-            excess.append(self.subentries.pop())
+        total = sum(map(lambda se: se.normaltime, self.subentries))
+        if total <= self.duration:
+            return []
+        heap = [(se.priority, -i) for i, se in enumerate(self.subentries)]
+        heapq.heapify(heap)
+        evicted: list[int] = []
+        while total > self.duration:
+            _, neg_index = heapq.heappop(heap)
+            evicted.append(-neg_index)
+            total -= self.subentries[-neg_index].normaltime
+        excess = [self.subentries[i] for i in evicted]
+        evicted_set = set(evicted)
+        self.subentries = [se for i, se in enumerate(self.subentries) if i not in evicted_set]
         if excess:
             print(f"The following entries do not fit in {self}: \n{excess}.")
         return excess
@@ -0,0 +1,113 @@
+import re
+from typing import Iterable, Iterator, Optional
+
+from ...util import NKTime
+from ...util.nkdatetime.nktime import NoneTime
+from .entry import Empty, Entry
+
+MINUTES_PER_DAY = 24 * 60
+
+MOVABLE = 1
+FIXED = 2
+BLOCK = 4
+EMPTY = 8
+
+
+def flag_table(flags: int) -> bytes:
+    """
+    Translation table mapping each slot value to 1 if it has any of the given flags, else 0.
+    """
+    return bytes(int(bool(value & flags)) for value in range(256))
+
+
+OR_TABLES = {flags: bytes(value | flags for value in range(256)) for flags in range(16)}
+OCCUPIED_TABLE = flag_table(MOVABLE | FIXED)
+COVERED_TABLE = flag_table(MOVABLE | FIXED | EMPTY)
+FIXED_TABLE = flag_table(FIXED)
+FREE_RUN = re.compile(b"\x00+")
+
+
+class Occupancy:
+    """
+    Minute-resolution occupancy of a day: one byte per minute, holding the flags of the entries
+      covering that minute (MOVABLE or FIXED, and BLOCK for entries with blocks). `Empty`
+      entries are marked EMPTY and otherwise leave their minutes free; entries without times
+      are left out. Queries run as bulk bytes operations instead of walking entry lists.
+    """
+
+    def __init__(self, entries: Iterable[Entry] = ()) -> None:
+        self.slots = bytearray(MINUTES_PER_DAY)
+        for entry in entries:
+            self.add(entry)
+
+    @staticmethod
+    def span(entry: Entry) -> Optional[tuple[int, int]]:
+        if isinstance(entry.start, NoneTime) or isinstance(entry.end, NoneTime):
+            return None
+        return entry.start.tominutes(), entry.end.tominutes()
+
+    def add(self, entry: Entry) -> None:
+        """
+        Marks the minutes covered by the entry as occupied.
+        """
+        if (span := self.span(entry)) is None or span[0] >= span[1]:
+            return
+        start, end = span
+        if isinstance(entry, Empty):
+            flags = EMPTY
+        else:
+            flags = (MOVABLE if entry.ismovable else FIXED) | (BLOCK if entry.blocks else 0)
+        self.slots[start:end] = self.slots[start:end].translate(OR_TABLES[flags])
+
+    def occupied(self, start: int = 0, end: int = MINUTES_PER_DAY) -> bytes:
+        """
+        Returns one byte per minute in [start, end): 1 if occupied, else 0.
+        """
+        return self.slots[start:end].translate(OCCUPIED_TABLE)
+
+    @property
+    def empty_time(self) -> int:
+        return self.occupied().count(0)
+
+    @property
+    def bounds(self) -> tuple[int, int]:
+        """
+        Returns the first and one past the last minute covered by any entry, `Empty` ones
+          included, or (0, 0) if there are none.
+        """
+        covered = self.slots.translate(COVERED_TABLE)
+        first = covered.find(1)
+        return (0, 0) if first < 0 else (first, covered.rfind(1) + 1)
+
+    def is_free(self, start: NKTime, end: NKTime) -> bool:
+        return 1 not in self.occupied(start.tominutes(), end.tominutes())
+
+    @property
+    def unfixed_time(self) -> int:
+        """
+        Returns the number of minutes not covered by fixed entries.
+        """
+        return self.slots.translate(FIXED_TABLE).count(0)
+
+    def has_fixed(self, start: NKTime, end: NKTime) -> bool:
+        return 1 in self.slots[start.tominutes() : end.tominutes()].translate(FIXED_TABLE)
+
+    def gaps(
+        self, start: int = 0, end: int = MINUTES_PER_DAY, empty_is_free: bool = True
+    ) -> Iterator[tuple[NKTime, NKTime]]:
+        """
+        Yields the start and end of every maximal run of free minutes in [start, end). Unless
+          `empty_is_free`, minutes covered by `Empty` entries do not count as free.
+        """
+        table = OCCUPIED_TABLE if empty_is_free else COVERED_TABLE
+        for match in FREE_RUN.finditer(self.slots[start:end].translate(table)):
+            yield NKTime.fromminutes(start + match.start()), NKTime.fromminutes(start + match.end())
+
+    def first_gap(self, duration: int, after: Optional[NKTime] = None) -> Optional[NKTime]:
+        """
+        Returns the earliest time, not before `after`, from which at least `duration` minutes
+          are free, or None if there is no such gap.
+        """
+        start = after.tominutes() if after else 0
+        index = self.occupied().find(bytes(max(duration, 1)), start)
+        return None if index < 0 else NKTime.fromminutes(index)
@@ -1,12 +1,14 @@
+import heapq
 import json
+from collections import Counter, deque
 from itertools import chain
 from pathlib import Path
-from typing import Iterable, Iterator
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
 
 from nebokrai.configuration import PathManager
 from nebokrai.util import color
 
-from ...util import NKDate
+from ...util import NKDate, ProjectID, TaskID
 from ...util.serde.custom_dict_types import (
     CalendarDictRaw,
     DeclarationDictRaw,
@@ -19,6 +21,9 @@ from ..container.tasks import Tasks
 from .calendar import Calendar
 from .task import Task
 
+if TYPE_CHECKING:
+    from .dependency_graph import DependencyGraph
+
 
 class Plan:
     """
@@ -32,7 +37,109 @@ class Plan:
     ) -> None:
         self.calendar = calendar
         self.tasks: Tasks = Tasks()
-        self.plan_dict: dict[NKDate, Tasks] = {date: Tasks() for date in calendar}
+        self.plan_dict = {date: Tasks() for date in calendar}
+
+    @property
+    def plan_dict(self) -> dict[NKDate, Tasks]:
+        return self._plan_dict
+
+    @plan_dict.setter
+    def plan_dict(self, __plan_dict: dict[NKDate, Tasks]) -> None:
+        self._plan_dict = __plan_dict
+        self._available: dict[NKDate, dict[str, int]] = {}
+        self._capacity: dict[NKDate, dict[str, int]] = {}
+        self._dates: dict[TaskID, NKDate] = {
+            task_id: date for date, tasks in __plan_dict.items() for task_id in tasks.keys()
+        }
+        self._project_dates: dict[ProjectID, Counter[NKDate]] = {}
+        self._project_latest: dict[ProjectID, NKDate] = {}
+        for task_id, date in self._dates.items():
+            self._project_dates.setdefault(task_id.project_id, Counter())[date] += 1
+
+    def assign(self, date: NKDate, tasks: Tasks) -> None:
+        """
+        Replaces the tasks planned on a date and updates the reverse indices accordingly. The
+          capacity ledger is left as is; callers placing tasks are responsible for it.
+        """
+        for task_id in self._plan_dict.get(date, Tasks()).keys():
+            if self._dates.get(task_id) == date:
+                del self._dates[task_id]
+                self._unindex_project_date(task_id.project_id, date)
+        for task_id in tasks.keys():
+            if (previous := self._dates.get(task_id)) is not None:
+                self._unindex_project_date(task_id.project_id, previous)
+            self._dates[task_id] = date
+            self._project_dates.setdefault(task_id.project_id, Counter())[date] += 1
+            latest = self._project_latest.get(task_id.project_id)
+            if latest is not None and latest < date:
+                self._project_latest[task_id.project_id] = date
+        self._plan_dict[date] = tasks
+
+    def _unindex_project_date(self, project_id: ProjectID, date: NKDate) -> None:
+        dates = self._project_dates[project_id]
+        dates[date] -= 1
+        if not dates[date]:
+            del dates[date]
+            if self._project_latest.get(project_id) == date:
+                del self._project_latest[project_id]
+
+    def project_dates(self, project_id: ProjectID) -> tuple[int, Optional[NKDate]]:
+        """
+        Returns the number of planned tasks of a project and the date of the last of them (None
+          if none is planned). Both are kept up to date by `assign`, the latter computed once
+          per change of the project's last date.
+        """
+        dates = self._project_dates.get(project_id)
+        if not dates:
+            return 0, None
+        if project_id not in self._project_latest:
+            self._project_latest[project_id] = max(dates)
+        return dates.total(), self._project_latest[project_id]
+
+    def date_of(self, task: Task | TaskID) -> NKDate:
+        """
+        Returns the date on which a task (or task id) is planned. Raises a KeyError if the task is
+          not currently planned.
+        """
+        return self._dates[task.task_id if isinstance(task, Task) else task]
+
+    def available(self, date: NKDate) -> dict[str, int]:
+        """
+        Returns the time the calendar makes available on a date, in the format of
+          `Day.available_dict`, computed once per date.
+        """
+        if date not in self._available:
+            self._available[date] = self.calendar[date].available_dict
+        return self._available[date]
+
+    def capacity(self, date: NKDate) -> dict[str, int]:
+        """
+        Returns the capacity ledger for a date: the time still available as empty time, in total,
+          and in each block, in the format of `Day.available_dict`. The ledger starts from
+          `available` and is kept up to date by `charge` and by the placement functions.
+        """
+        if date not in self._capacity:
+            self._capacity[date] = dict(self.available(date))
+            for task in self._plan_dict.get(date, []):
+                self.charge(date, task)
+        return self._capacity[date]
+
+    def reset_capacity(self, date: NKDate) -> dict[str, int]:
+        """
+        Resets the capacity ledger for a date to the time available in the calendar, as if no
+          task were planned on it, and returns it.
+        """
+        self._capacity[date] = dict(self.available(date))
+        return self._capacity[date]
+
+    def charge(self, date: NKDate, task: Task) -> None:
+        """
+        Deducts the time of a task placed on the given date from that date's capacity ledger.
+        """
+        ledger = self.capacity(date)
+        key = task.block_assigned if task.block_assigned in ledger else "empty"
+        ledger[key] -= task.remaining_duration
+        ledger["total"] -= task.remaining_duration
 
     def serialize(self) -> PlanDictRaw:
         return {str(date): tasks.serialize() for date, tasks in self.plan_dict.items()}
@@ -81,13 +188,9 @@ class Plan:
     @property
     def inverse(self) -> dict[Task, NKDate]:
         """
-        Returns a dictionary mapping tasks to dates.
+        Returns a dictionary mapping tasks to dates. For single lookups, use `date_of`.
         """
-        inverse_plan: dict[Task, NKDate] = {}
-        for date, tasks_ in self.items():
-            for task_ in tasks_:
-                inverse_plan.update({task_: date})
-        return inverse_plan
+        return {task: date for date, tasks_ in self.items() for task in tasks_}
 
     def ensure_date(self, date: NKDate):
         if date not in self.plan_dict:
@@ -125,7 +228,8 @@ class Plan:
         return self.plan_dict.get(__date, __default)
 
     def __setitem__(self, __date: NKDate, __tasks: Tasks) -> None:
-        self.plan_dict.update({__date: __tasks})
+        self.assign(__date, __tasks)
+        self._capacity.pop(__date, None)
 
     @property
     def summary(self) -> str:
@@ -141,15 +245,15 @@ class Plan:
         linechar = "―"
         circles = {"todo": "○", "done": "●"}
 
-        date2idx = {d: i for i, d in enumerate(min(self.plan_dict).range(max(self.plan_dict)))}
-        ndays = len(date2idx)
+        dates = min(self.plan_dict).range(max(self.plan_dict))
+        ndays = len(dates)
 
         def format_name(proj_name: str) -> str:
             if len(proj_name) <= project_name_max_length:
                 return f"{proj_name: <{project_name_max_length}} ║ "
             return proj_name[: (project_name_max_length - 6)] + "…" + proj_name[-5:] + " ║ "
 
-        project_names = list(
+        project_names = sorted(
             set(map(lambda t: t.project_name, chain.from_iterable(self.plan_dict.values())))
         )
         pname2idx = {p: i for i, p in enumerate(project_names)}
@@ -162,7 +266,7 @@ class Plan:
         for _date, _tasks in self.plan_dict.items():
             for task in _tasks:
                 pnum = pname2idx[task.project_name]
-                dnum = date2idx[_date]
+                dnum = dates.index(_date)
                 symbol = circles[task.status]
                 grid[pnum][dnum] = symbol
 
@@ -239,43 +343,281 @@ def handle_blocked(tasks: Tasks, avail_dict: dict[str, int]) -> Tasks:
     pass
 
 
-def add_tasks(plan: Plan, date: NKDate, tasks: Iterable[Task]) -> tuple[Plan, Tasks]:
+def add_tasks(
+    plan: Plan,
+    date: NKDate,
+    tasks: Iterable[Task],
+    graph: Optional["DependencyGraph"] = None,
+) -> tuple[Plan, Tasks]:
     """
     Add tasks to a specified date in the plan. If the tasks exceed the date's available time,
-      the lowest-priority excess task ids are returned.
+      the lowest-priority excess task ids are returned. The tasks already on the date compete
+      with the new ones, starting from the time the calendar makes available.
+
+    If a dependency graph is given, tasks whose dependencies are not all planned on earlier
+      dates are returned with the excess, and tasks on which an already planned task depends
+      are not moved.
     """
     plan.ensure_date(date)
-    tasks = Tasks(tasks) + plan.plan_dict.get(date, [])
+    capacity = plan.reset_capacity(date)
+
+    settled, unsettled = Tasks(), []
+    for task in plan.plan_dict[date]:
+        if graph and graph.is_pinned(plan, task.task_id):
+            settled.add(task)
+            plan.charge(date, task)
+        else:
+            unsettled.append(task)
+    tasks = Tasks(tasks)
+    deferred = Tasks()
+    if graph:
+        deferred = Tasks([t for t in tasks if not graph.permits(plan, t.task_id, date)])
+        tasks.remove_tasks(deferred)
+    tasks = tasks + unsettled
     # tasks.fold_into_blocks()
-    avail_dict: dict[str, int] = plan.calendar[date].available_dict
 
-    blocked_tasks: Tasks = tasks.pop_tasks_from_blocks(avail_dict)
-    excess: Tasks = tasks.pop_excess_tasks(avail_dict["empty"])
+    blocked_tasks: Tasks = tasks.pop_tasks_from_blocks(capacity)
+    excess: Tasks = tasks.pop_excess_tasks(capacity)
+    excess.extend(deferred)
 
     # can now add blocked tasks,  since they will not require additional time
     tasks.extend(blocked_tasks)
+    tasks.extend(settled)
     tasks.sort(key=lambda t: t.priority)
     tasks.update_tmpdate(date)
     tasks.update_original_date(date)
 
-    plan.plan_dict.update({date: tasks})
+    plan.assign(date, tasks)
     return plan, excess
 
 
 def update_plan(
     plan: Plan,
     subplan: dict[NKDate, Tasks],
+    graph: Optional["DependencyGraph"] = None,
 ) -> Plan:
     """
     Adds subplan (like plan, but corresponding to single project) to the plan,
       rolling tasks over when the daily maximum is exceeded, according to priority.
+
+    If a dependency graph is given, no task is placed on or before the date of one of its
+      dependencies; tasks are rolled over until their dependencies are planned. Subplans must
+      then be added in the order given by `DependencyGraph.project_order`, and a ValueError is
+      raised if a task depends on one that is neither planned nor part of the subplan.
     """
+    if graph:
+        subplan = order_subplan(subplan, graph)
     for date, tasks_ in subplan.items():
-        plan, rollover = add_tasks(plan, date, tasks_)
+        plan, rollover = add_tasks(plan, date, tasks_, graph)
 
         next_date = date.copy()
         while rollover:
-            plan, rollover = add_tasks(plan, next_date, rollover)
+            if graph:
+                graph.assert_satisfiable(plan, rollover.keys())
+            plan, rollover = add_tasks(plan, next_date, rollover, graph)
             next_date += 1
 
     return plan
+
+
+def order_subplan(subplan: dict[NKDate, Tasks], graph: "DependencyGraph") -> dict[NKDate, Tasks]:
+    """
+    Moves tasks of a subplan that are scheduled before one of their dependencies in the same
+      subplan to the date of that dependency, visiting the tasks in topological order.
+    """
+    dates = {task.task_id: date for date, tasks_ in subplan.items() for task in tasks_}
+    tasks = {task.task_id: task for tasks_ in subplan.values() for task in tasks_}
+    for task_id in sorted(dates, key=graph.rank.__getitem__):
+        for dependency in graph.dependencies(task_id):
+            if dependency in dates and dates[dependency] > dates[task_id]:  # type: ignore
+                dates[task_id] = dates[dependency]  # type: ignore
+
+    ordered: dict[NKDate, Tasks] = {}
+    for task_id, date in sorted(dates.items(), key=lambda item: item[1]):
+        ordered.setdefault(date, Tasks()).add(tasks[task_id])
+    return ordered
+
+
+class _Rollover:
+    """
+    Tasks pushed out of the plan and waiting for a later date, kept in exactly the order in which
+      `add_tasks` would receive them as `rollover`. Reversing the order (as `pop_excess_tasks`
+      does) is O(1), and tasks that could still go into a block are tracked separately, so tasks
+      further back in the queue are not touched until they are placed.
+    """
+
+    def __init__(self, tasks: Iterable[Task], block_names: set[str]) -> None:
+        self._queue: deque[tuple[int, Task]] = deque()
+        self._candidates: deque[tuple[int, Task]] = deque()
+        self._present: dict[TaskID, int] = {}
+        self._candidate_tokens: dict[TaskID, int] = {}
+        self._token = 0
+        self._forward = True
+        self._block_names = block_names
+        self.categories: Counter[str] = Counter()
+        self._candidate_durations: Counter[int] = Counter()
+        for task in tasks:
+            self.push(task)
+
+    def push(self, task: Task) -> None:
+        """
+        Appends a task to the (logical) end of the queue.
+        """
+        self._token += 1
+        item = (self._token, task)
+        (self._queue.append if self._forward else self._queue.appendleft)(item)
+        self._present[task.task_id] = self._token
+        self.categories.update(task.categories)
+        if not task.block_assigned and not task.categories.isdisjoint(self._block_names):
+            (self._candidates.append if self._forward else self._candidates.appendleft)(item)
+            self._candidate_tokens[task.task_id] = self._token
+            self._candidate_durations[task.remaining_duration] += 1
+
+    def discard(self, task: Task) -> None:
+        """
+        Marks a task as no longer pending; it is dropped lazily from the underlying deques.
+        """
+        del self._present[task.task_id]
+        for category in task.categories:
+            self.categories[category] -= 1
+            if not self.categories[category]:
+                del self.categories[category]
+        if self._candidate_tokens.pop(task.task_id, None) is not None:
+            self._candidate_durations[task.remaining_duration] -= 1
+            if not self._candidate_durations[task.remaining_duration]:
+                del self._candidate_durations[task.remaining_duration]
+
+    def peek(self) -> Optional[Task]:
+        """
+        Returns the first pending task without removing it, or None if there is none.
+        """
+        pop = self._queue.popleft if self._forward else self._queue.pop
+        while self._queue:
+            token, task = self._queue[0] if self._forward else self._queue[-1]
+            if self._present.get(task.task_id) == token:
+                return task
+            pop()
+        return None
+
+    def candidates(self) -> Iterator[Task]:
+        """
+        Iterates over pending tasks that might still go into a block, in queue order.
+        """
+        ordered = self._candidates if self._forward else reversed(self._candidates)
+        tokens = self._candidate_tokens
+        return (task for token, task in ordered if tokens.get(task.task_id) == token)
+
+    def compact_candidates(self) -> None:
+        self._candidates = deque(
+            (token, task)
+            for token, task in self._candidates
+            if self._candidate_tokens.get(task.task_id) == token
+        )
+
+    @property
+    def min_candidate_duration(self) -> Optional[int]:
+        return min(self._candidate_durations) if self._candidate_durations else None
+
+    def reverse(self) -> None:
+        self._forward = not self._forward
+
+    def __bool__(self) -> bool:
+        return bool(self._present)
+
+
+def _add_rollover(plan: Plan, date: NKDate, rollover: _Rollover) -> None:
+    """
+    Equivalent to `add_tasks(plan, date, rollover)`, with the excess tasks left in `rollover`.
+      Only the tasks placed on `date` (and the tasks already there) are touched.
+    """
+    plan.ensure_date(date)
+    available = plan.reset_capacity(date)
+    existing = list(plan.plan_dict[date].values())
+
+    category_names = set(rollover.categories)
+    for task in existing:
+        category_names.update(task.categories)
+    relevant_block_names = sorted(
+        set(available).intersection(category_names), key=lambda bl: (available[bl], bl)
+    )
+
+    def block(task: Task) -> bool:
+        dur = task.remaining_duration
+        for block_name in relevant_block_names:
+            if (block_name in task.categories) and (dur <= available[block_name]):
+                task.block_assigned = block_name
+                available[block_name] -= dur
+                available["total"] -= dur
+                return True
+        return False
+
+    blocked: list[Task] = []
+    min_duration = rollover.min_candidate_duration
+    if relevant_block_names and min_duration is not None:
+        exhausted = False
+        for task in rollover.candidates():
+            if max(map(available.__getitem__, relevant_block_names)) < min_duration:
+                exhausted = True
+                break
+            if block(task):
+                rollover.discard(task)
+                blocked.append(task)
+        if not exhausted:
+            rollover.compact_candidates()
+    for task in existing:
+        if not task.block_assigned and block(task):
+            blocked.append(task)
+
+    blocked_ids = {task.task_id for task in blocked}
+    remaining = [task for task in existing if task.task_id not in blocked_ids]
+    available_empty = available["empty"]
+    kept: list[Task] = []
+    total = 0
+    while (head := rollover.peek()) is not None:
+        if total + head.remaining_duration > available_empty:
+            break
+        rollover.discard(head)
+        kept.append(head)
+        total += head.remaining_duration
+    if not rollover:
+        while remaining and total + remaining[0].remaining_duration <= available_empty:
+            kept.append(task := remaining.pop(0))
+            total += task.remaining_duration
+    available["empty"] -= total
+    available["total"] -= total
+    for task in remaining:
+        rollover.push(task)
+    rollover.reverse()
+
+    tasks = Tasks({t.task_id: t for t in sorted(kept + blocked, key=lambda t: t.task_id)})
+    tasks.update_tmpdate(date)
+    tasks.update_original_date(date)
+    plan.assign(date, tasks)
+
+
+def sweep_plan(plan: Plan, subplans: Iterable[dict[NKDate, Tasks]]) -> Plan:
+    """
+    Adds several subplans to the plan in a single pass over the calendar, using a priority queue
+      of pending tasks keyed by date and subplan order. Produces exactly the same plan as calling
+      `update_plan` for each subplan in turn: each call to `add_tasks` only reads and writes its
+      own date (and its capacity ledger) and its own rollover, so the calls can be reordered by
+      date. Rolled-over tasks are only touched when they are placed.
+    """
+    block_names = {"empty", "total"}.union(*(plan.calendar[d].blocks for d in plan.calendar))
+    queue: list[tuple[int, int, NKDate, _Rollover, bool]] = []
+    index = 0
+    for subplan in subplans:
+        for date, tasks_ in subplan.items():
+            queue.append((int(date), index, date, _Rollover(tasks_, block_names), True))
+            index += 1
+    heapq.heapify(queue)
+
+    while queue:
+        ordinal, index, date, rollover, first = heapq.heappop(queue)
+        _add_rollover(plan, date, rollover)
+        if rollover and first:
+            _add_rollover(plan, date, rollover)
+        if rollover:
+            heapq.heappush(queue, (ordinal + 1, index, date + 1, rollover, False))
+
+    return plan
@@ -5,7 +5,7 @@ from nebokrai.util import color
 from nebokrai.util.serde.custom_dict_types import ProjectDictRaw
 
 from ...configuration import config
-from ...util import NKDate, ProjectID, RoadmapID, TaskID, tabularize
+from ...util import NKDate, ProjectID, RoadmapID, TaskID, stable_hash, tabularize
 from ..container.tasks import Tasks
 from .task import Task
 
@@ -36,7 +36,7 @@ class Project:
         self._tasks = tasks
         self.priority = priority or config.default_priority
         self.start = start or NKDate.tomorrow() + config.default_project_dates_missing_offset + (
-            hash(self.name) % config.default_project_dates_missing_hashmod
+            stable_hash(self.name) % config.default_project_dates_missing_hashmod
         )
         self.end = end if end else None
         self.interval = interval or config.default_interval
@@ -46,6 +46,7 @@ class Project:
         self.notes = notes
         self.dependencies = dependencies or set()
         self.categories = (categories or set()).union(config.default_categories)
+        self.declaration: Optional[ProjectDictRaw] = None
 
         if self.end:
             assert (
@@ -74,7 +75,7 @@ class Project:
             project_categories=categories,
         )
 
-        return cls(
+        project = cls(
             project_dict["name"],
             project_id,
             tasks=tasks,
@@ -88,6 +89,8 @@ class Project:
             notes=project_dict.get("notes", ""),
             categories=categories,
         )
+        project.declaration = project_dict
+        return project
 
     def copy(self) -> "Project":
         copy = Project(
@@ -104,11 +107,28 @@ class Project:
         copy.__dict__.update(self.__dict__)
         return copy
 
+    @property
+    def cluster_size(self) -> int:
+        return self._cluster_size
+
+    @cluster_size.setter
+    def cluster_size(self, __cluster_size: int) -> None:
+        self._cluster_size = __cluster_size
+        self._clusters: Optional[list[list[Task]]] = None
+        self._clusters_version = -1
+
     @property
     def clusters(self) -> list[list[Task]]:
         """
-        Divides a list of tasks into k clusters of size `cluster_size`.
+        Divides a list of tasks into k clusters of size `cluster_size`. The clusters are cached
+          until the tasks or the cluster size change.
         """
+        if self._clusters is None or self._clusters_version != self._tasks.version:
+            self._clusters = self._make_clusters()
+            self._clusters_version = self._tasks.version
+        return self._clusters
+
+    def _make_clusters(self) -> list[list[Task]]:
         # def split_for_date_constraints(cluster: Iterable[Task]) -> list[list[Task]]:
         #     tasks = sorted(cluster, key=lambda t: (t.earliest_date, t.latest_date))
         #     first = [tasks.pop(0)]
@@ -187,22 +207,42 @@ class Project:
 
         return protoplan
 
-    def make_protoplan_end_fixed(
-        self, clusters: list[list[Task]], start: NKDate, end: NKDate
-    ) -> list[tuple[NKDate, Tasks]]:
-        nclusters = len(clusters)
-        while nclusters > start.daysto(end):
+    def fit_cluster_size(self, ndays: int) -> None:
+        """
+        Increases `cluster_size` (if necessary) to the smallest size for which the project's
+          tasks fit into `ndays` clusters, i.e. one cluster per day.
+        """
+        if ndays < 1:
+            raise ValueError(f"Project {str(self.project_id)} has no days to plan tasks on.")
+        required = -(-len(self._tasks) // ndays)
+        if required > self.cluster_size:
             time_info = f"{self.start} - {self.end}"
-            cluster_info = f"{nclusters} clusters, cluster size {self.cluster_size}"
+            cluster_info = f"{len(self.clusters)} clusters, cluster size {self.cluster_size}"
             print(
                 f"Not enough time allocated to '{str(self.project_id)}': "
-                f"{time_info}, {cluster_info}. Incrementing cluster size."
+                f"{time_info}, {cluster_info}. Increasing cluster size to {required}."
+            )
+            self.cluster_size = required
+
+    def make_protoplan_end_fixed(
+        self, clusters: list[list[Task]], start: NKDate, end: NKDate
+    ) -> list[tuple[NKDate, Tasks]]:
+        """
+        Spaces out clusters evenly between start (inclusive) and end (exclusive). If there are
+          more clusters than days, the tasks are regrouped into one cluster per day.
+        """
+        ndays = start.daysto(end)
+        if ndays < 1:
+            raise ValueError(
+                f"Impossible to create subplan from project {str(self.project_id)}: "
+                f"no days left between {start} and {end}."
             )
-            self.cluster_size += 1
-            # clusters = self.clusters
-            nclusters = len(clusters)
+        if len(clusters) > ndays:
+            tasks = [task for cluster in clusters for task in cluster]
+            size = -(-len(tasks) // ndays)
+            clusters = [tasks[i : i + size] for i in range(0, len(tasks), size)]
 
-        ndays = int(end) - int(start)
+        nclusters = len(clusters)
         factor = ndays / nclusters
         offsets = [int(round(i * factor)) for i in range(nclusters)]
         protoplan: list[tuple[NKDate, Tasks]] = [
@@ -213,29 +253,50 @@ class Project:
     def plan_tasks_end_fixed(
         self, clusters: list[list[Task]], start: NKDate, end: NKDate
     ) -> dict[NKDate, Tasks]:
-        """ """
-        protoplan = self.make_protoplan_end_fixed(clusters, start, end)
+        """
+        Spaces out clusters between start and end. If a cluster cannot be placed on its date
+          because of the earliest or latest permissible dates of its tasks, it and the remaining
+          clusters are spaced out again, starting from the permissible date. Raises a ValueError
+          if a cluster's earliest permissible date is after its latest one, or if spacing out
+          again would not make progress.
+        """
         final_plan: dict[NKDate, Tasks] = {}
-        protoplan_list = list(protoplan.items())
-        while protoplan_list:
-            protodate, cluster = protoplan_list.pop(0)
-            earliest = cluster.earliest_date
-            latest = cluster.latest_date
-            if latest and latest < protodate:
-                if (not final_plan) or (max(final_plan) < latest):
-                    return final_plan | self.plan_tasks_end_fixed(
-                        [clust for d, clust in protoplan_list], latest, end
+        last_date: Optional[NKDate] = None
+        pending: list[list[Task]] = clusters
+        failed_starts: set[NKDate] = set()
+        while pending:
+            protoplan = self.make_protoplan_end_fixed(pending, start, end)
+            pending = []
+            for i, (protodate, cluster) in enumerate(protoplan):
+                earliest = cluster.earliest_date
+                latest = cluster.latest_date
+                if earliest and latest and earliest > latest:
+                    raise ValueError(
+                        f"Impossible to create subplan from project {str(self.project_id)}: "
+                        f"tasks {', '.join(map(str, cluster.keys()))} must be planned together, "
+                        f"but the earliest permissible date ({earliest}) is after the latest "
+                        f"permissible date ({latest})."
                     )
-                self.check_latest(latest, protodate)
-                # raise ValueError(
-                #     f"Impossible to create subplan from project {str(self.project_id)}"
-                #     " due to latest date of at least one task (interval-based planning)."
-                # )
-            if earliest and earliest > protodate:
-                return final_plan | self.plan_tasks_end_fixed(
-                    [clust for d, clust in protoplan_list], earliest, end
-                )
-            final_plan.update({protodate: cluster})
+                if latest and latest < protodate:
+                    if last_date is not None and last_date >= latest:
+                        self.check_latest(latest, protodate)
+                    start = latest
+                elif earliest and earliest > protodate:
+                    start = earliest
+                else:
+                    final_plan.update({protodate: cluster})
+                    last_date = protodate
+                    continue
+                if i == 0:
+                    # nothing was placed in this pass, so it must not restart where another did
+                    if start in failed_starts:
+                        raise ValueError(
+                            f"Impossible to create subplan from project {str(self.project_id)}: "
+                            f"no permissible date for tasks {', '.join(map(str, cluster.keys()))}."
+                        )
+                    failed_starts.add(start)
+                pending = [list(clust) for _, clust in protoplan[i:]]
+                break
         return final_plan
 
     def make_protoplan_end_flex(
@@ -271,14 +332,14 @@ class Project:
                 )
         return final_plan
 
-    def check_earliest(self, earliest: NKDate, other: NKDate) -> None:
+    def check_earliest(self, earliest: Optional[NKDate], other: NKDate) -> None:
         if earliest and earliest > other:
             raise ValueError(
                 f"Impossible to create subplan from project {str(self.project_id)}"
                 " due to earliest date of at least one task (interval-based planning)."
             )
 
-    def check_latest(self, latest: NKDate, other: NKDate) -> None:
+    def check_latest(self, latest: Optional[NKDate], other: NKDate) -> None:
         if latest and latest < other:
             raise ValueError(
                 f"Impossible to create subplan from project {str(self.project_id)}"
@@ -291,15 +352,14 @@ class Project:
         Spaces out a list of clusters between a start and end date, given some interval.
         """
         # subplan = self.plan_tasks(self._tasks)
+        if self.end:
+            self.fit_cluster_size(self.start.daysto(self.end))
         clusters, start = self.clusters, self.start
         match (len(clusters)):
             case 0:
                 return {}
             case 1:
-                cluster = clusters[0]
-                earliest, latest = cluster.earliest_date, cluster.latest_date
-
-                return {start: Tasks(cluster)}
+                return {start: Tasks(clusters[0])}
             case _:
                 return (
                     self.plan_tasks_end_fixed(clusters, start, self.end)
@@ -314,6 +374,11 @@ class Project:
     def tasks(self) -> Tasks:
         return self._tasks
 
+    @tasks.setter
+    def tasks(self, __tasks: Tasks) -> None:
+        self._tasks = __tasks
+        self._clusters = None
+
     @property
     def task_ids(self) -> list[TaskID]:
         return self._tasks.task_ids
@@ -3,7 +3,7 @@ from typing import Any, Callable, Iterable, Optional, Union
 from nebokrai.util import color
 
 from ...configuration import config
-from ...util import NKDate, NKTime, tabularize
+from ...util import DateSet, NKDate, NKTime, RecurrenceRule, tabularize
 from ...util.serde.custom_dict_types import RoutineDictRaw
 from ..container.entries import Entries
 from .entry import Entry
@@ -27,7 +27,7 @@ class Routine:
         maxtime: int,
         ismovable: bool,
         order: float,
-        valid_dates: Union[Callable[[NKDate], bool], set[NKDate]] = lambda d: True,
+        valid_dates: Optional[Union[Callable[[NKDate], bool], set[NKDate], DateSet]] = None,
     ) -> None:
         self.name = name
         self.start = start
@@ -40,14 +40,14 @@ class Routine:
         self.maxtime = maxtime
         self.ismovable = ismovable
         self.order = order
-
-        def validator(d: NKDate) -> bool:
-            ret: bool = (
-                (d in valid_dates) if hasattr(valid_dates, "__contains__") else valid_dates(d)
-            )
-            return ret
-
-        self.valid_dates = validator
+        self.valid_dates: Optional[Union[Callable[[NKDate], bool], DateSet]] = (
+            DateSet.from_dates(valid_dates) if isinstance(valid_dates, set) else valid_dates
+        )
+        self._valid_predicate: Optional[Callable[[NKDate], bool]] = (
+            None if isinstance(self.valid_dates, DateSet) else self.valid_dates
+        )
+        self._compiled: dict[tuple[NKDate, NKDate], DateSet] = {}
+        self._window: Optional[DateSet] = None
 
     @classmethod
     def deserialize(cls, routine_dict: RoutineDictRaw) -> "Routine":
@@ -57,6 +57,7 @@ class Routine:
         items: list[Entry] = []
         for item_dict in routine_dict["items"]:
             items.append(Entry.deserialize(item_dict))
+        valid = routine_dict.get("valid")
 
         return cls(
             routine_dict["name"],
@@ -76,11 +77,32 @@ class Routine:
                 if "default_order" in routine_dict
                 else config.default_order
             ),
+            valid_dates=RecurrenceRule.deserialize(valid).compile() if valid else None,
         )
 
     def valid_on(self, date: NKDate) -> bool:
+        if self.valid_dates is None:
+            return True
+        if isinstance(self.valid_dates, DateSet):
+            return date in self.valid_dates
+        window = self._window
+        if window is not None and window.first <= date <= window.last:
+            return date in window
         return self.valid_dates(date)
 
+    def compile_valid_dates(self, first: NKDate, last: NKDate) -> None:
+        """
+        Precompiles a callable `valid_dates` into the set of valid dates between first and last
+          (inclusive), so that checks within this horizon are bitmap lookups. Dates outside of it
+          are still checked with the callable. Compiled sets are cached per horizon.
+        """
+        if self._valid_predicate is None:
+            return
+        if (window := self._compiled.get((first, last))) is None:
+            window = DateSet.from_predicate(first, last, self._valid_predicate)
+            self._compiled[(first, last)] = window
+        self._window = window
+
     def as_entry(
         self,
         start: NKTime,
@@ -1,11 +1,14 @@
+import math
 from typing import Callable, Iterable, Optional, Union
 
 from ...configuration import config
 from ...util import NKDate, NKTime, color, tabularize
 from ...util.serde.custom_dict_types import ScheduleDictRaw
 from ..container.entries import Entries
+from ..container.tasks import Tasks
 from .calendar import Calendar
 from .entry import Empty, Entry
+from .occupancy import MINUTES_PER_DAY, Occupancy
 from .plan import Plan
 
 
@@ -31,10 +34,14 @@ class Schedule:
 
         # algo
         self.weight_interval_min = (
-            weight_interval_min or config.default_schedule_weight_interval_min
+            config.default_schedule_weight_interval_min
+            if weight_interval_min is None
+            else weight_interval_min
         )
         self.weight_interval_max = (
-            weight_interval_max or config.default_schedule_weight_interval_max
+            config.default_schedule_weight_interval_max
+            if weight_interval_max is None
+            else weight_interval_max
         )
         self.schedule_weight_transform_exponent = (
             schedule_weight_transform_exponent or config.default_sched_weight_transform_exp
@@ -60,7 +67,11 @@ class Schedule:
 
     @classmethod
     def from_calendar(cls, calendar: Calendar, date: NKDate) -> "Schedule":
-        return cls(date, calendar[date].entries)
+        """
+        Creates the schedule of a date from copies of the calendar's entries, so that
+          scheduling (e.g. adding subentries to blocks) leaves the calendar untouched.
+        """
+        return cls(date, map(Entry.shallow_copy, calendar[date].entries))
 
     @classmethod
     def from_derivation(cls, schedule_derivation_dict: ScheduleDictRaw) -> "Schedule":
@@ -72,6 +83,47 @@ class Schedule:
         schedule_list: list[Entry] = []
         return Schedule(date, schedule_list)  # TODO
 
+    @property
+    def schedule(self) -> Entries:
+        return self._schedule
+
+    @schedule.setter
+    def schedule(self, schedule: Entries) -> None:
+        self._schedule = schedule
+        self._block_index: Optional[tuple[int, dict[str, tuple[int, Entry]]]] = None
+
+    @property
+    def occupancy(self) -> Occupancy:
+        """
+        Minute-resolution occupancy of the schedule, kept by the entries and rebuilt on first
+          use after any modification of them.
+        """
+        return self.schedule.occupancy
+
+    @property
+    def block_index(self) -> dict[str, tuple[int, Entry]]:
+        """
+        Maps each block to the position and entry of the first entry in the schedule offering
+          it, i.e. to where an entry of that category is placed by `add_to_blocks`. Built on
+          first use and rebuilt whenever the entries' version changes.
+        """
+        if self._block_index is None or self._block_index[0] != self.schedule.version:
+            index: dict[str, tuple[int, Entry]] = {}
+            for position, entry in enumerate(self.schedule):
+                for block in entry.blocks:
+                    index.setdefault(block, (position, entry))
+            self._block_index = (self.schedule.version, index)
+        return self._block_index[1]
+
+    def block_for(self, entry: Entry) -> Optional[Entry]:
+        """
+        Returns the first entry in the schedule with a block matching one of the categories of
+          the given entry, or None if there is none.
+        """
+        index = self.block_index
+        candidates = [index[category] for category in entry.categories if category in index]
+        return min(candidates, key=lambda c: c[0])[1] if candidates else None
+
     def remove(self, entry: Entry) -> None:
         self.schedule.remove(entry)
 
@@ -86,25 +138,29 @@ class Schedule:
 
     def can_be_added(self, entry: Entry) -> bool:
         """
-        Checks whether the given entry can be added.
+        Checks whether the given entry can be added, i.e. whether it overlaps no fixed entry
+          and the sum of minimum durations, including its own, stays below a full day.
         """
         if not entry.start:
             return True
         if not self.schedule.overlaps_are_movable(entry):
             return False
-        if not entry.ismovable:
-            overlaps = self.schedule.get_overlaps(entry)
-            if not all(map(lambda x: x.ismovable, overlaps)):
-                return False
-        return sum(map(lambda x: x.mintime, self.schedule)) + entry.mintime < (24 * 60)
+        return self.schedule.total_mintime + entry.mintime < MINUTES_PER_DAY
 
     @property
     def empty_time(self) -> int:
         """
-        Returns the amount of empty time remaining in the schedule.
+        Returns the amount of empty time remaining in the schedule, i.e. the minutes not covered
+          by any entry other than `Empty` ones.
+        """
+        return self.occupancy.empty_time
+
+    def first_gap(self, duration: int, after: Optional[NKTime] = None) -> Optional[NKTime]:
+        """
+        Returns the earliest time (not before `after`) followed by at least `duration` empty
+          minutes, or None if there is no such gap.
         """
-        empties = filter(lambda e: isinstance(e, Empty), self.schedule)
-        return sum(map(lambda e: e.duration, empties))
+        return self.occupancy.first_gap(duration, after)
 
     @property
     def total_available(self) -> int:
@@ -119,7 +175,7 @@ class Schedule:
         time_dict: dict[str, int] = {}
         time_dict.update({"empty": self.empty_time})
         time_dict.update({"total": self.total_available})
-        for block in self.schedule.blocks:
+        for block in sorted(self.schedule.blocks):
             time_dict.update({block: self.schedule.available_for_block(block)})
         return time_dict
 
@@ -138,6 +194,45 @@ class Schedule:
 
         return time_weight_from_prio
 
+    def compress(self, flex: list[Entry], fixed: list[Entry]) -> tuple[list[Entry], list[Entry]]:
+        """
+        Fits the movable entries into the time left free by the fixed ones, by resizing them
+          between their mintime and maxtime according to their priority weights (see
+          `compress_durations`). Entries already in the schedule are kept first, then new ones
+          by descending priority as long as their mintimes fit; returns the kept entries (in the
+          given order, as resized copies) and the ones that do not fit. Times are left to
+          `zip_flex_and_fixed`, which also bounds each entry by the gap it is placed in.
+        """
+        available = Occupancy(fixed).empty_time
+        resident = {id(entry) for entry in self.schedule}
+        movable = [entry for entry in flex if not isinstance(entry, Empty)]
+
+        overflow_ids = set()
+        reserved = 0
+        for entry in sorted(movable, key=lambda e: (id(e) not in resident, -e.priority)):
+            if reserved + entry.mintime <= available:
+                reserved += entry.mintime
+            else:
+                overflow_ids.add(id(entry))
+        kept = [entry for entry in movable if id(entry) not in overflow_ids]
+        overflow = [entry for entry in movable if id(entry) in overflow_ids]
+
+        weight = self.prio_weighting_function
+        durations = compress_durations(
+            [entry.normaltime for entry in kept],
+            [entry.mintime for entry in kept],
+            [entry.maxtime for entry in kept],
+            [weight(min(max(entry.priority, 0), 100)) for entry in kept],
+            available,
+        )
+        resized: dict[int, Entry] = {}
+        for entry, duration in zip(kept, durations):
+            resized[id(entry)] = entry.shallow_copy()
+            resized[id(entry)].normaltime = duration
+
+        flex = [resized.get(id(e), e) for e in flex if id(e) in resized or isinstance(e, Empty)]
+        return flex, overflow
+
     def get_flex_entries_and_fixed_clusters(
         self, entries: Entries = Entries()
     ) -> tuple[list[Entry], list[Entry]]:
@@ -191,6 +286,56 @@ class Schedule:
         return f"Schedule {self.date}: {' | '.join(map(stringify, self.schedule))}"
 
 
+def distribute(amount: float, room: list[int], share: list[float]) -> list[float]:
+    """
+    Splits an amount into parts proportional to `room[i] * share[i]`, capping each part at
+      `room[i]` and redistributing the remainder among the uncapped parts.
+    """
+    parts = [0.0] * len(room)
+    active = [i for i, r in enumerate(room) if r > 0 and share[i] > 0]
+    while amount > 0 and active:
+        factor = amount / sum(room[i] * share[i] for i in active)
+        capped = [i for i in active if factor * share[i] >= 1]
+        if not capped:
+            for i in active:
+                parts[i] = factor * share[i] * room[i]
+            break
+        for i in capped:
+            parts[i] = room[i]
+            amount -= room[i]
+        active = [i for i in active if factor * share[i] < 1]
+    return parts
+
+
+def compress_durations(
+    normal: list[int],
+    minimum: list[int],
+    maximum: list[int],
+    weights: list[float],
+    available: int,
+) -> list[int]:
+    """
+    Returns durations filling `available` minutes as far as the bounds allow. If the normal
+      durations exceed the available time, entries are shrunk toward their minimum, each by an
+      amount proportional to its leeway divided by its weight; if there is slack, they are
+      stretched toward their maximum, proportionally to leeway times weight. Higher-priority
+      entries thus keep closer to, or grow further beyond, their normal durations. Entries with
+      a weight of 0 are shrunk first and never stretched.
+    """
+    total = sum(normal)
+    if total > available:
+        leeway = [max(0, n - m) for n, m in zip(normal, minimum)]
+        idle = [lee if w <= 0 else 0 for lee, w in zip(leeway, weights)]
+        first = distribute(total - available, idle, [1.0] * len(idle))
+        shares = [1 / w if w > 0 else 0.0 for w in weights]
+        rest = distribute(total - available - sum(first), leeway, shares)
+        cuts = [a + b for a, b in zip(first, rest)]
+        return [max(m, n - math.ceil(c)) for n, m, c in zip(normal, minimum, cuts)]
+    leeway = [max(0, m - n) for n, m in zip(normal, maximum)]
+    extensions = distribute(available - total, leeway, weights)
+    return [n + math.floor(e) for n, e in zip(normal, extensions)]
+
+
 def entries_from_plan_and_excess(plan: Plan, excess: Entries, date: NKDate) -> Entries:
     """
     Combine entries from plan with excess
@@ -202,18 +347,28 @@ def entries_from_plan_and_excess(plan: Plan, excess: Entries, date: NKDate) -> E
 
 def add_to_blocks(schedule: Schedule, entries: Entries) -> tuple[Schedule, Entries]:
     """
-    Add entries to blocks in schedule where possible.
+    Add entries to blocks in schedule where possible, one batch per block. Subentries evicted
+      from full blocks are kept in (or returned to) the list.
     """
-    to_remove = []
+    batches: dict[int, tuple[Entry, list[Entry]]] = {}
     for entry in entries:
-        for block in schedule.schedule:
-            if entry.categories.intersection(block.blocks) and entry not in to_remove:
-                block.add_subentry(entry)
-                print(f"Added {color.yellow(entry.fullname)} to {color.green(str(schedule.date))}.")
-
-                to_remove.append(entry)
+        if (block := schedule.block_for(entry)) is not None:
+            batches.setdefault(id(block), (block, []))[1].append(entry)
+            print(f"Added {color.yellow(entry.fullname)} to {color.green(str(schedule.date))}.")
+
+    evicted: list[Entry] = []
+    for block, batch in batches.values():
+        evicted.extend(block.add_subentries(batch))
+    if batches:
+        schedule.schedule.touch()
+    placed_ids = {id(entry) for _, batch in batches.values() for entry in batch}
+    placed_ids.difference_update(id(entry) for entry in evicted)
+    listed_ids = {id(entry) for entry in entries}
+
+    to_remove = [entry for entry in entries if id(entry) in placed_ids]
+    entries.remove_all(to_remove)
+    entries.extend([entry for entry in evicted if id(entry) not in listed_ids])
     for entry in to_remove:
-        entries.remove(entry)
         print(f"Removed {color.yellow(entry.fullname)} from list.")
     return schedule, entries
 
@@ -221,20 +376,24 @@ def add_to_blocks(schedule: Schedule, entries: Entries) -> tuple[Schedule, Entri
 def zip_flex_and_fixed(
     flex_entries: list[Entry],
     fixed_entries: list[Entry],
-) -> Entries:
+) -> tuple[Entries, list[Entry]]:
     """
     Adds two lists, consisting of movable and immovable entries, according to which one fits next
-      without violating immovability constraints.
+      without violating immovability constraints, setting the times of the movable entries.
+      Returns the entries and the movable entries that do not fit before the end of the day.
     """
     flex_entries.sort(key=lambda e: (e.order, -e.priority))
     new_entries = Entries()
+    overflow: list[Entry] = []
 
     while flex_entries or fixed_entries:
         # color.pgreen("Zipping fixed and flex entries:")
         # color.pgreen(new_entries.summary)
-        flex_entries, fixed_entries = new_entries.append_flex_or_fixed(flex_entries, fixed_entries)
+        flex_entries, fixed_entries = new_entries.append_flex_or_fixed(
+            flex_entries, fixed_entries, overflow
+        )
 
-    return new_entries
+    return new_entries, overflow
 
 
 def assert_plan_and_date(plan: Optional[Plan], date: NKDate) -> Plan:
@@ -248,20 +407,46 @@ def assert_plan_and_date(plan: Optional[Plan], date: NKDate) -> Plan:
     return plan
 
 
+def add_entries(schedule: Schedule, entries: Entries) -> tuple[Schedule, Entries]:
+    """
+    Adds entries to the schedule: into blocks where possible, and otherwise (compressed as
+      needed) around the fixed entries. Returns the schedule and the entries that did not fit.
+    """
+    schedule, entries = add_to_blocks(schedule, entries)
+    flex_entries, fixed_clusters = schedule.get_flex_entries_and_fixed_clusters(entries)
+    flex_entries, overflow = schedule.compress(flex_entries, fixed_clusters)
+
+    schedule.schedule, unplaced = zip_flex_and_fixed(flex_entries, fixed_clusters)
+    overflow.extend(unplaced)
+    schedule.overflow = Entries(overflow)
+
+    return schedule, Entries(overflow)
+
+
 def add_from_plan_and_excess(
     schedule: Schedule, plan: Optional[Plan], excess: Entries
 ) -> tuple[Schedule, "Entries"]:
     """
-    Adds all tasks planned for this day, converting tasks to entries.
+    Adds all tasks planned for this day, converting tasks to entries, together with the excess
+      carried over. Returns the schedule and the entries that did not fit into it.
     """
     color.pblack("Entering add_from_plan_and_excess()")
     plan = assert_plan_and_date(plan, schedule.date)
     entries: Entries = entries_from_plan_and_excess(plan, excess, schedule.date)
-    schedule, entries = add_to_blocks(schedule, entries)
-    flex_entries, fixed_clusters = schedule.get_flex_entries_and_fixed_clusters(entries)
-
-    schedule.schedule = zip_flex_and_fixed(flex_entries, fixed_clusters)
+    schedule, overflow = add_entries(schedule, entries)
 
     color.pblack("Exiting add_from_plan_and_excess()")
 
-    return schedule, entries
+    return schedule, overflow
+
+
+def derive_base_schedule(
+    date: NKDate, day_entries: Entries, tasks: Tasks
+) -> tuple[Schedule, Entries]:
+    """
+    Derives the schedule of a day from its calendar entries and planned tasks alone, i.e. as
+      `add_from_plan_and_excess` does when there is no excess. Intended to be run in a worker
+      process.
+    """
+    entries = Entries(map(lambda t: t.as_entry(), tasks))
+    return add_entries(Schedule(date, day_entries), entries)
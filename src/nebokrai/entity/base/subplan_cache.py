@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+from ...configuration import config
+from ...util import NKDate, TaskID
+from ..container.tasks import Tasks
+from .project import Project
+
+SubplanLayout = dict[str, list[list[str]]]
+
+# Version of the subplan generation (clustering and protoplanning) and of the cache format; bump
+#   it whenever either changes, so that entries written by earlier versions are not served.
+SUBPLAN_VERSION = 1
+
+
+class SubplanCache:
+    """
+    On-disk memo cache of project subplans, with one JSON file per project state. Entries are
+      keyed by a SHA-256 hash of the project's declaration dict, its resolved dates, the config
+      defaults that enter into planning, and `SUBPLAN_VERSION`, so unchanged projects skip
+      clustering and protoplan generation. Only the task ids planned on each date are stored;
+      subplans are rebuilt from the project's own Task objects. The least recently used entries
+      are evicted once there are more than `max_entries`.
+    """
+
+    def __init__(self, cache_dir: Path, max_entries: int = 1024) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+
+    @staticmethod
+    def key(project: Project) -> Optional[str]:
+        """
+        Returns the cache key of a project, or None if it was not created from a declaration.
+        """
+        if project.declaration is None:
+            return None
+        payload = {
+            "version": SUBPLAN_VERSION,
+            "project_id": list(project.project_id),
+            "declaration": project.declaration,
+            "start": str(project.start),
+            "end": str(project.end),
+            "config": {
+                "default_priority": config.default_priority,
+                "default_duration": config.default_duration,
+                "default_interval": config.default_interval,
+                "default_cluster_size": config.default_cluster_size,
+                "default_categories": sorted(config.default_categories),
+            },
+        }
+        serialized = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    def path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, project: Project) -> Optional[dict[NKDate, Tasks]]:
+        """
+        Returns the cached subplan of a project, or None on a cache miss. Unreadable entries
+          count as misses.
+        """
+        if (key := self.key(project)) is None or not (path := self.path(key)).exists():
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                layout: SubplanLayout = json.load(f)
+            subplan = {
+                NKDate.from_string(date): Tasks([project.tasks[TaskID(*t)] for t in task_ids])
+                for date, task_ids in layout.items()
+            }
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        os.utime(path)
+        return subplan
+
+    def put(self, project: Project, subplan: dict[NKDate, Tasks]) -> None:
+        """
+        Stores the subplan of a project.
+        """
+        if (key := self.key(project)) is None:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        layout: SubplanLayout = {
+            str(date): [list(task_id) for task_id in tasks.keys()]
+            for date, tasks in subplan.items()
+        }
+        tmp_path = self.path(key).with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(layout, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path(key))
+
+    def subplan(self, project: Project) -> dict[NKDate, Tasks]:
+        """
+        Returns the subplan of a project, from the cache if possible.
+        """
+        subplan = self.get(project)
+        if subplan is None:
+            subplan = project.subplan
+            self.put(project, subplan)
+        return subplan
+
+    def evict(self) -> None:
+        """
+        Deletes the least recently used entries beyond `max_entries`.
+        """
+        if not self.cache_dir.exists():
+            return
+        entries = sorted(self.cache_dir.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        for path in entries[: max(0, len(entries) - self.max_entries)]:
+            path.unlink(missing_ok=True)
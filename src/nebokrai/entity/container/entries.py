@@ -1,3 +1,4 @@
+import bisect
 import itertools
 import operator
 from typing import Any, Callable, Iterable, Iterator, Optional, Union
@@ -5,18 +6,95 @@ from typing import Any, Callable, Iterable, Iterator, Optional, Union
 from nebokrai.util import color
 
 from ...util import NKTime
+from ...util.nkdatetime.nktime import END_OF_DAY, MIDNIGHT, NoneTime
 from ..base.entry import Empty, Entry
+from ..base.occupancy import MINUTES_PER_DAY, Occupancy
 
 EntriesInitType = Optional[Union["Entries", Iterable[Entry]]]
 
 
+def by_start(entry: Entry) -> NKTime:
+    return entry.start
+
+
+def has_times(entry: Entry) -> bool:
+    return not isinstance(entry.start, NoneTime) and not isinstance(entry.end, NoneTime)
+
+
+class OverlapIndex:
+    """
+    Index answering which of a set of entries overlap a query entry in O(log n + k). Entries
+      are kept sorted by start time; since none of them is longer than `max_duration`, every
+      entry overlapping the query starts no earlier than `max_duration` before it does. Entries
+      without start or end time are kept aside and always checked.
+    """
+
+    def __init__(self, entries: Iterable[Entry] = ()) -> None:
+        self._starts: list[tuple[int, int, Entry]] = []
+        self._items: dict[int, list[tuple[int, int, Entry]]] = {}
+        self._untimed: list[Entry] = []
+        self._counter = itertools.count()
+        self.max_duration = 0
+        for entry in entries:
+            self.add(entry)
+
+    def add(self, entry: Entry) -> None:
+        if not has_times(entry):
+            self._untimed.append(entry)
+            return
+        item = (entry.start.tominutes(), next(self._counter), entry)
+        bisect.insort(self._starts, item)
+        self._items.setdefault(id(entry), []).append(item)
+        self.max_duration = max(self.max_duration, entry.duration)
+
+    def discard(self, entry: Entry) -> None:
+        """
+        Removes the given entry object (by identity, as entries compare by value).
+        """
+        if not (items := self._items.get(id(entry))):
+            for i, untimed in enumerate(self._untimed):
+                if untimed is entry:
+                    del self._untimed[i]
+                    return
+            return
+        item = items.pop()
+        if not items:
+            del self._items[id(entry)]
+        del self._starts[bisect.bisect_left(self._starts, item)]
+
+    def overlapping(self, entry: Entry) -> Iterator[Entry]:
+        """
+        Yields the indexed entries overlapping the query entry, ordered by start time.
+        """
+        if has_times(entry):
+            start, end = entry.start.tominutes(), entry.end.tominutes()
+            low = bisect.bisect_left(self._starts, (start - self.max_duration,))
+            high = bisect.bisect_left(self._starts, (max(end, start + 1),))
+            candidates = self._starts[low:high]
+        else:
+            candidates = self._starts
+        timed = map(operator.itemgetter(2), candidates)
+        yield from filter(entry.overlaps, itertools.chain(timed, self._untimed))
+
+
 class Entries:
     """
-    Container class for multiple instances of the Entry class.
+    Container class for multiple instances of the Entry class. Keeps track of whether the
+      entries are ordered by start time, so that ordered instances (e.g. schedules under
+      construction) can be extended by bisection and need not be sorted again.
+
+    Every modification bumps `version`, which keys the cached occupancy map and the caches of
+      containers holding the instance (see `Schedule.block_index`).
     """
 
     def __init__(self, entries: EntriesInitType = None) -> None:
         self._entries: list[Entry] = list(entries or [])
+        self._ordered: Optional[bool] = None
+        self._index: Optional[OverlapIndex] = None
+        self.version = 0
+        self._derived_version = -1
+        self._occupancy: Optional[Occupancy] = None
+        self._total_mintime = 0
 
     def copy(self) -> "Entries":
         return Entries((entry.copy() for entry in self._entries))
@@ -26,33 +104,132 @@ class Entries:
 
     def insert(self, __index: int, __other: Entry) -> None:
         self._entries.insert(__index, __other)
+        self._ordered = None
+        self.version += 1
+        if self._index is not None:
+            self._index.add(__other)
 
     def append(self, __other: Entry) -> None:
+        if self._ordered and self._entries and __other.start < self._entries[-1].start:
+            self._ordered = False
         self._entries.append(__other)
+        self.version += 1
+        if self._index is not None:
+            self._index.add(__other)
 
     def extend(self, __other: Union["Entries", list[Entry]]) -> None:
-        self._entries.extend(list(__other))
+        other = list(__other)
+        self._entries.extend(other)
+        self._ordered = None
+        self.version += 1
+        if self._index is not None:
+            for entry in other:
+                self._index.add(entry)
+
+    def insort(self, __other: Entry) -> None:
+        """
+        Inserts an entry such that the entries remain ordered by start time (after any entries
+          with the same start time).
+        """
+        self.ensure_ordered()
+        bisect.insort_right(self._entries, __other, key=by_start)
+        self.version += 1
+        if self._index is not None:
+            self._index.add(__other)
+
+    @property
+    def isordered(self) -> bool:
+        """
+        Checks whether the entries are ordered by start time; the result is cached until the
+          next modification that could change it.
+        """
+        if self._ordered is None:
+            self._ordered = all(
+                map(lambda x: x[0].start <= x[1].start, zip(self._entries, self._entries[1:]))
+            )
+        return self._ordered
+
+    def ensure_ordered(self) -> None:
+        """
+        Sorts the entries by start time, unless they are known to be ordered already.
+        """
+        if not self.isordered:
+            self._entries.sort(key=by_start)
+            self._ordered = True
+            self.version += 1
 
     def index(self, __entry: Entry) -> int:
         return self._entries.index(__entry)
 
     def pop(self, __index: int = -1) -> Entry:
         entry = self._entries.pop(__index)
+        self.version += 1
+        if self._index is not None:
+            self._index.discard(entry)
         return entry
 
     def remove(self, __entry: Entry) -> None:
-        self._entries.remove(__entry)
+        self.pop(self._entries.index(__entry))
 
-    def sort(self, key: Callable[[Entry], Any] = lambda e: e.start) -> None:
+    def remove_all(self, __entries: Iterable[Entry]) -> None:
+        """
+        Removes the given entry objects (by identity) in a single pass.
+        """
+        ids = {id(entry) for entry in __entries}
+        if self._index is not None:
+            for entry in self._entries:
+                if id(entry) in ids:
+                    self._index.discard(entry)
+        self._entries = [entry for entry in self._entries if id(entry) not in ids]
+        self.version += 1
+
+    def sort(self, key: Callable[[Entry], Any] = by_start) -> None:
         self._entries.sort(key=key)
+        self._ordered = True if key is by_start else None
+        self.version += 1
+
+    def touch(self) -> None:
+        """
+        Records a change to the entries themselves rather than to the list, e.g. subentries
+          added to a block, so that caches keyed by `version` are rebuilt.
+        """
+        self.version += 1
+
+    def _derive(self) -> None:
+        """
+        Rebuilds the occupancy map and the total mintime of the entries if the entries were
+          modified since they were last built.
+        """
+        if self._derived_version != self.version:
+            self._occupancy = Occupancy(self._entries)
+            self._total_mintime = sum(e.mintime for e in self._entries)
+            self._derived_version = self.version
+
+    @property
+    def occupancy(self) -> Occupancy:
+        """
+        Minute-resolution occupancy of the entries, rebuilt on first use after a modification.
+        """
+        self._derive()
+        assert self._occupancy is not None
+        return self._occupancy
+
+    @property
+    def total_mintime(self) -> int:
+        self._derive()
+        return self._total_mintime
 
     @property
     def start(self) -> NKTime:
-        return min(self._entries, key=lambda x: x.start).start if self._entries else NKTime()
+        if not self._entries:
+            return NKTime()
+        if self.isordered:
+            return self._entries[0].start
+        return min(self._entries, key=lambda x: x.start).start
 
     @property
     def end(self) -> NKTime:
-        return max(self._entries, key=lambda x: x.end).end if self._entries else NKTime(24)
+        return max(self._entries, key=lambda x: x.end).end if self._entries else END_OF_DAY
 
     @property
     def total_duration(self) -> int:
@@ -118,23 +295,31 @@ class Entries:
         return (
             adjacency
             and (self._entries[0].start == NKTime())
-            and (self._entries[-1].end == NKTime(24))
+            and (self._entries[-1].end == END_OF_DAY)
         )
 
+    @property
+    def overlap_index(self) -> OverlapIndex:
+        """
+        Index for overlap queries, built on first use and kept in sync by the methods adding
+          and removing entries. Entries must not be moved while they are indexed.
+        """
+        if self._index is None:
+            self._index = OverlapIndex(self._entries)
+        return self._index
+
     def get_overlaps(self, entry: Entry) -> "Entries":
         """
-        Return an instance of Entries containing all entries that overlap with the query entry.
+        Return an instance of Entries containing all entries that overlap with the query entry,
+          ordered by start time.
         """
-        return Entries(filter(entry.overlaps, self._entries))
+        return Entries(self.overlap_index.overlapping(entry))
 
     def overlaps_are_movable(self, entry: Entry) -> bool:
         """
         Check whether the entries that overlap with the query entry are all movable.
         """
-        overlaps = self.get_overlaps(entry)
-        if not overlaps:
-            return True
-        return all(map(lambda x: x.ismovable, overlaps))
+        return all(map(lambda x: x.ismovable, self.overlap_index.overlapping(entry)))
 
     def get_flex_sandwiches(self) -> list[tuple[list[Entry], list[Entry], list[Entry]]]:
         """
@@ -154,35 +339,43 @@ class Entries:
         return list(zip(entries_list[::2], entries_list[1::2], entries_list[2::2]))
 
     def append_flex_or_fixed(
-        self, flex: list[Entry], fixed: list[Entry]
+        self, flex: list[Entry], fixed: list[Entry], overflow: list[Entry]
     ) -> tuple[list[Entry], list[Entry]]:
         """
         Receives two lists, consisting of flex and fixed (movable and immovable) entries.
           Adds whichever entry comes next, subject to the constraint that if a flex entry is too
-          long to fit before the next fixed entry, the fixed entry will be added.
-        """
-        self._entries = self.entries_sorted
-        if not (flex or fixed):
-            pass
-        if not flex:
-            self._entries.append(fixed.pop(0))
-        elif not fixed:
-            self._entries.append(flex.pop(0))
+          long to fit before the next fixed entry, the fixed entry will be added. A copy of a flex
+          entry is placed at the end of the entries added so far and shortened to the time left
+          before the next fixed entry (or the end of the day), leaving the given entry untouched;
+          if there is no fixed entry left and its mintime does not fit, it is moved to `overflow`
+          instead.
+        """
+        self.ensure_ordered()
+        start = self.earliest_end
+        available = start.timeto(fixed[0].start if fixed else END_OF_DAY)
+        if flex and available >= flex[0].mintime:
+            entry = flex.pop(0).shallow_copy()
+            entry.start, entry.end = start, start + min(entry.normaltime, available)
+            self.insort(entry)
+        elif fixed:
+            self.insort(fixed.pop(0))
         else:
-            hard_boundary = fixed[0].start if fixed else NKTime(24)
-            available = self.earliest_end.timeto(hard_boundary)
-            next_entry = flex.pop(0) if available >= flex[0].mintime else fixed.pop(0)
-            self._entries.append(next_entry)
+            overflow.append(flex.pop(0))
 
         return flex, fixed
 
     @property
     def earliest_end(self) -> NKTime:
-        return NKTime(0) if not self._entries else self.entries_sorted[-1].end
+        if not self._entries:
+            return MIDNIGHT
+        self.ensure_ordered()
+        return self._entries[-1].end
 
     @property
     def entries_sorted(self) -> list[Entry]:
-        return sorted(self._entries, key=lambda e: e.start)
+        if self.isordered:
+            return list(self._entries)
+        return sorted(self._entries, key=by_start)
 
     def get_inds_of_relevant_blocks(self, entry: Entry) -> list[int]:
         """
@@ -202,24 +395,30 @@ class Entries:
         """
         Check whether the sum of minimum durations of all entries fits in a single day.
         """
-        return sum(map(lambda x: x.mintime, self._entries)) < (24 * 60)
+        return self.total_mintime < MINUTES_PER_DAY
 
     @property
     def with_gaps(self) -> list[Union[Entry, Empty]]:
         """
         Version of the instance with all empty space accounted for, via `Empty` objects.
         """
-        gaps = self.gaps
-        return sorted([*self._entries, *gaps], key=lambda e: e.start)
+        if not self.isordered:
+            return sorted([*self._entries, *self.gaps], key=by_start)
+        with_gaps: list[Union[Entry, Empty]] = self._entries[:1]
+        for a, b in zip(self._entries, self._entries[1:]):
+            if a.end < b.start:
+                with_gaps.append(Empty(start=a.end, end=b.start))
+            with_gaps.append(b)
+        return with_gaps
 
     @property
     def gaps(self) -> list[Empty]:
         """
         Return a list of empty entries corresponding to the times which are not yet occupied.
         """
-        pairs = zip(self._entries[None:-1], self._entries[1:None])
-        gaps = [Empty(start=a.end, end=b.start) for a, b in pairs]
-        return [gap for gap in gaps if gap.duration > 0]
+        occupancy = self.occupancy
+        gaps = occupancy.gaps(*occupancy.bounds, empty_is_free=False)
+        return [Empty(start=start, end=end) for start, end in gaps]
 
     @property
     def summary(self) -> str:
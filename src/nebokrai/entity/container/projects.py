@@ -1,14 +1,19 @@
-from typing import Any, Iterator, Optional, Union
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any, Iterator, Optional, Union
 
 from nebokrai.util import color
 
 from ...configuration import config
-from ...util import ProjectID, RoadmapID, TaskID, tabularize
+from ...util import NKDate, ProjectID, RoadmapID, TaskID, tabularize
 from ...util.serde.custom_dict_types import ProjectDictRaw
 from ..base.project import Project
 from ..base.task import Task
 from ..container.tasks import Tasks
 
+if TYPE_CHECKING:
+    from ..base.subplan_cache import SubplanCache
+
 
 class Projects:
     """
@@ -51,6 +56,33 @@ class Projects:
     def iter_by_priority(self) -> Iterator[Project]:
         return iter(sorted(list(self._projects.values()), key=lambda proj: proj.priority))
 
+    def subplans(
+        self, max_workers: Optional[int] = None, cache: Optional["SubplanCache"] = None
+    ) -> dict[ProjectID, dict[NKDate, Tasks]]:
+        """
+        Computes the subplans of all projects (in priority order) in a pool of worker processes.
+          The workers only return the task ids planned on each date, and the subplans are rebuilt
+          from this instance's own Task objects, so the result is identical to `Project.subplan`.
+          If a cache is given, only the subplans missing from it are computed (and then stored).
+        """
+        subplans: dict[ProjectID, Optional[dict[NKDate, Tasks]]] = {
+            project.project_id: cache.get(project) if cache else None
+            for project in self.iter_by_priority
+        }
+        projects = [self[project_id] for project_id, subplan in subplans.items() if subplan is None]
+        chunksize = max(1, len(projects) // (4 * (max_workers or os.cpu_count() or 1)))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            layouts = list(executor.map(subplan_layout, projects, chunksize=chunksize))
+        for project, layout in zip(projects, layouts):
+            subplan = {
+                date: Tasks([project.tasks[task_id] for task_id in task_ids])
+                for date, task_ids in layout.items()
+            }
+            if cache:
+                cache.put(project, subplan)
+            subplans[project.project_id] = subplan
+        return subplans  # type: ignore
+
     def get_task(self, task_id: TaskID) -> Task:
         if isinstance(task_id, TaskID):
             return self._projects[task_id.project_id][task_id]
@@ -123,3 +155,11 @@ class Projects:
     @property
     def repr1(self) -> str:
         return color.red(" | ").join(map(lambda e: e.repr1, self))
+
+
+def subplan_layout(project: Project) -> dict[NKDate, list[TaskID]]:
+    """
+    Computes the subplan of a project and returns the ids of the tasks planned on each date.
+      Intended to be run in a worker process.
+    """
+    return {date: list(tasks.keys()) for date, tasks in project.subplan.items()}
@@ -1,9 +1,11 @@
+import json
 from typing import Iterable, Iterator, Optional
 
 from nebokrai.util import color
 
-from ...util import tabularize
-from ...util.serde.custom_dict_types import RoutinesDictRaw
+from ...util import NKTime, tabularize
+from ...util.serde.custom_dict_types import RoutineInCalendarDictRaw, RoutinesDictRaw
+from ..base.entry import Entry
 from ..base.routine import Routine
 
 
@@ -16,6 +18,7 @@ class Routines:
         self._routines: dict[str, Routine] = {
             rout.name.split(" ")[0].lower(): rout for rout in (routines or [])
         }
+        self._templates: dict[str, Entry] = {}
 
     @classmethod
     def deserialize(cls, routines_dict: RoutinesDictRaw) -> "Routines":
@@ -30,6 +33,38 @@ class Routines:
 
     def add(self, routine: Routine) -> None:
         self._routines.update({routine.name: routine})
+        self._templates.clear()
+
+    def routine_entry(self, routine_spec: RoutineInCalendarDictRaw) -> Entry:
+        """
+        Returns the entry of a routine as specified for a day in the calendar, i.e. with the
+          given overrides of the routine's defaults. The entry is resolved once per distinct
+          specification and shallowly copied for every day using it.
+        """
+        key = json.dumps(routine_spec, sort_keys=True, default=str)
+        if (template := self._templates.get(key)) is None:
+            template = self._templates[key] = self.resolve_routine_entry(routine_spec)
+        return template.shallow_copy()
+
+    def resolve_routine_entry(self, routine_spec: RoutineInCalendarDictRaw) -> Entry:
+        """
+        Creates the entry of a routine from a day's specification and the routine's defaults.
+        """
+        routine = self[routine_spec["name"]]
+        return routine.as_entry(
+            start=NKTime.from_string(routine_spec.get("start") or str(routine.start)),
+            priority=int(routine_spec.get("priority") or routine.priority),
+            normaltime=int(routine_spec.get("normaltime") or routine.normaltime),
+            idealtime=int(routine_spec.get("idealtime") or routine.idealtime),
+            mintime=int(routine_spec.get("mintime") or routine.mintime),
+            maxtime=int(routine_spec.get("maxtime") or routine.maxtime),
+            ismovable=bool(
+                routine_spec.get("ismovable")
+                if routine_spec.get("ismovable") is not None
+                else routine.ismovable
+            ),
+            order=float(routine_spec["order"] if "order" in routine_spec else routine.order),
+        )
 
     def pretty(self, width: int = 120) -> str:
         """
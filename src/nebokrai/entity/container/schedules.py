@@ -1,4 +1,4 @@
-from typing import Dict, Optional
+from typing import Dict, Iterator, Optional
 
 from nebokrai.util import color
 
@@ -38,6 +38,9 @@ class Schedules:
         assert isinstance(__value, Schedule)
         self._schedules.update({__key: __value})
 
+    def items(self) -> Iterator[tuple[NKDate, Schedule]]:
+        return iter(self._schedules.items())
+
     @property
     def summary(self) -> str:
         return "Schedules.summary property is not yet implemented."
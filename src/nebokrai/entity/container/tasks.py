@@ -14,10 +14,12 @@ TaskInitType = Optional[Union[Iterable[Task], dict[TaskID, Task]]]
 
 class Tasks:
     """
-    Container class for multiple instances of the Task class.
+    Container class for multiple instances of the Task class. Every addition or removal bumps
+      `version`, which keys the caches of objects holding the instance (see `Project.clusters`).
     """
 
     def __init__(self, tasks: TaskInitType = None) -> None:
+        self.version = 0
         self._tasks: OrderedDict[TaskID, Task] = OrderedDict()
         if isinstance(tasks, dict):
             self._tasks = OrderedDict(tasks)
@@ -66,15 +68,15 @@ class Tasks:
     #     """
     #     ...
 
-    def pop_tasks_from_blocks(self, available_dict: dict[str, int]) -> "Tasks":
+    def pop_tasks_from_blocks(self, capacity: dict[str, int]) -> "Tasks":
         """
-        Get tasks that can be added to the blocks specified in 'available_dict' and remove them
-          from self.
+        Get tasks that can be added to the blocks specified in the capacity ledger 'capacity' and
+          remove them from self. The time of the blocked tasks is deducted from the ledger.
         """
         relevant_block_names = sorted(
-            self.get_relevant_block_names(available_dict), key=lambda bl: available_dict[bl]
+            self.get_relevant_block_names(capacity), key=lambda bl: (capacity[bl], bl)
         )
-        blocked_tasks: Tasks = self.get_blocked_tasks(relevant_block_names, available_dict)
+        blocked_tasks: Tasks = self.get_blocked_tasks(relevant_block_names, capacity)
         self.remove_tasks(blocked_tasks)
 
         return blocked_tasks
@@ -84,30 +86,38 @@ class Tasks:
     ) -> "Tasks":
         """
         Get member tasks that can be added to blocks according to the block time availablity
-          dictionary.
+          dictionary. Each task goes to the first block (in the given order) matching one of its
+          categories that still has room for it; candidates are looked up per category rather
+          than by scanning all blocks.
         """
         blocked_tasks = Tasks()
-
-        def block_filter(categories: set[str]) -> Callable[[str], bool]:
-            def inner(block_name: str) -> bool:
-                return (block_name in categories) and (dur <= available_dict[block_name])
-
-            return inner
+        block_names: list[str] = []
+        rank: dict[str, int] = {}
+        for block_name in relevant_block_names:
+            if block_name not in rank:
+                rank[block_name] = len(block_names)
+                block_names.append(block_name)
 
         for task in self._tasks.values():
+            if task.block_assigned:
+                continue
             dur = task.remaining_duration
-            block_names = list(filter(block_filter(task.categories), relevant_block_names))
-
-            if block_names and not task.block_assigned:
-                task.block_assigned = (block_name := block_names[0])
-                blocked_tasks.add(task)
-                available_dict[block_name] -= dur
+            candidates = sorted(rank[c] for c in task.categories if c in rank)
+            for block_name in map(block_names.__getitem__, candidates):
+                if dur <= available_dict[block_name]:
+                    task.block_assigned = block_name
+                    blocked_tasks.add(task)
+                    available_dict[block_name] -= dur
+                    if "total" in available_dict:
+                        available_dict["total"] -= dur
+                    break
 
         return blocked_tasks
 
     def remove_tasks(self, to_remove: Iterable[Task]) -> None:
         for task in to_remove:
             del self._tasks[task.task_id]
+        self.version += 1
 
     def get_relevant_block_names(self, names: Iterable[str]) -> set[str]:
         """
@@ -119,16 +129,19 @@ class Tasks:
         relevant_block_names = set(names).intersection(category_names)
         return relevant_block_names
 
-    def pop_excess_tasks(self, available_empty: int) -> "Tasks":
+    def pop_excess_tasks(self, capacity: dict[str, int]) -> "Tasks":
         """
-        To be rewritten!
+        Removes tasks from the end until the remaining tasks fit into the empty time of the
+          capacity ledger 'capacity', deducts their time from it, and returns the removed tasks.
         """
         excess_tasks = Tasks()
         total = self.total_remaining_duration
-        while total > available_empty:
+        while total > capacity["empty"]:
             task_to_move = self.pop()
             excess_tasks.add(task_to_move)
             total -= task_to_move.remaining_duration
+        capacity["empty"] -= total
+        capacity["total"] -= total
         return excess_tasks
 
     def update_original_date(self, date: NKDate) -> None:
@@ -142,16 +155,38 @@ class Tasks:
     def extend(self, __tasks: "Tasks") -> None:
         for task in __tasks:
             self._tasks.update({task.task_id: task})
+        self.version += 1
 
     def add(self, __task: Task) -> None:
         self._tasks.update({__task.task_id: __task})
+        self.version += 1
 
     def remove(self, task: Task) -> None:
         del self._tasks[task.task_id]
+        self.version += 1
 
     def pop(self, last: bool = True) -> Task:
+        self.version += 1
         return self._tasks.popitem(last=last)[1]
 
+    @property
+    def earliest_date(self) -> Optional[NKDate]:
+        """
+        Returns the earliest date on which all member tasks may be planned, if any task has an
+          earliest permissible date.
+        """
+        dates = [t.date_earliest for t in self._tasks.values() if t.date_earliest is not None]
+        return max(dates) if dates else None
+
+    @property
+    def latest_date(self) -> Optional[NKDate]:
+        """
+        Returns the latest date on which all member tasks may be planned, if any task has a latest
+          permissible date.
+        """
+        dates = [t.date_latest for t in self._tasks.values() if t.date_latest is not None]
+        return min(dates) if dates else None
+
     @property
     def task_ids(self) -> list[TaskID]:
         return [t.task_id for t in self]
@@ -193,6 +228,7 @@ class Tasks:
     def update(self, __tasks: Union["Tasks", dict[TaskID, Task]]) -> None:
         for task_id, task in __tasks.items():
             self._tasks.update({task_id: task})
+        self.version += 1
 
     def items(self) -> Iterator[tuple[TaskID, Task]]:
         return iter(self._tasks.items())
@@ -225,6 +261,7 @@ class Tasks:
         else:
             for __task in __task_or_tasks:
                 self._tasks.update({__task.task_id: __task})
+        self.version += 1
         return self
 
     def __bool__(self) -> bool:
@@ -1,13 +1,18 @@
+import contextlib
+import itertools
 import json
 import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime
-from typing import Any, Optional, Union
+from typing import Any, ContextManager, Iterable, Iterator, Optional, Union
 
 from . import configuration
 from .configuration import PathManager, path_manager
 from .entity import (
     Calendar,
     Day,
+    DependencyGraph,
     Entries,
     Plan,
     Project,
@@ -17,12 +22,18 @@ from .entity import (
     Routines,
     Schedule,
     Schedules,
+    SubplanCache,
     Task,
+    Tasks,
     add_from_plan_and_excess,
+    derive_base_schedule,
+    sweep_plan,
     update_plan,
 )
 from .tracking import Logs, Tracker
 from .util import NKDate, ProjectID, RoadmapID, TaskID, color, shift_declaration_ndays
+from .util.serde.custom_dict_types import ScheduleDictRaw
+from .util.serde.serialization import dump_json_list
 
 
 class NebokraiEntryPoint:
@@ -76,6 +87,10 @@ class NebokraiEntryPoint:
 
     def derive_plan(
         self,
+        sweep: bool = False,
+        respect_dependencies: bool = False,
+        parallel: bool = False,
+        cache: bool = False,
     ) -> None:
         """
         Create the plan (the one instance of the `Plan` class) from the roadmaps and calendar,
@@ -85,6 +100,19 @@ class NebokraiEntryPoint:
           * deterministic (same input -> same output)
           This makes the automated planning process predictable and transparent.
 
+        With `sweep`, all subplans are placed in a single pass over the calendar (see
+          `sweep_plan`); the resulting plan is identical.
+
+        With `respect_dependencies`, projects are planned in dependency order and no task is
+          placed on or before the date of one of its dependencies, so that the precedence check
+          cannot fail. This mode cannot be combined with `sweep`.
+
+        With `parallel`, the subplans of all projects are computed up front in a process pool
+          (see `Projects.subplans`); the resulting plan is identical.
+
+        With `cache`, subplans of unchanged projects are read from (and new ones written to)
+          the on-disk subplan cache under the root directory (see `SubplanCache`).
+
         Not yet implemented:
           functionality for breaking up and reallocating clusters. -> Happens automatically?
         """
@@ -97,36 +125,118 @@ class NebokraiEntryPoint:
         #     plan = Plan.from_derivation(path_manager.declaration, path_manager.derivation)
 
         projects = self.roadmaps.projects
-
-        for project in projects.iter_by_priority:
-            plan = update_plan(plan, project.subplan)
-            print(f"Planning {color.magenta(project.name)}.")
-
+        subplan_cache = SubplanCache(self.path_manager.subplan_cache_dir) if cache else None
+        subplans = projects.subplans(cache=subplan_cache) if parallel else {}
+
+        def get_subplan(project: Project) -> dict[NKDate, Tasks]:
+            if project.project_id in subplans:
+                return subplans[project.project_id]
+            if subplan_cache:
+                return subplan_cache.subplan(project)
+            return project.subplan
+
+        if respect_dependencies:
+            if sweep:
+                raise ValueError("`sweep` cannot be combined with `respect_dependencies`.")
+            graph = DependencyGraph(projects)
+            project_ids = [project.project_id for project in projects.iter_by_priority]
+            for project_id in graph.project_order(project_ids):
+                plan = update_plan(plan, get_subplan(projects[project_id]), graph)
+                print(f"Planning {color.magenta(projects[project_id].name)}.")
+        elif sweep:
+            plan = sweep_plan(plan, map(get_subplan, projects.iter_by_priority))
+        else:
+            for project in projects.iter_by_priority:
+                plan = update_plan(plan, get_subplan(project))
+                print(f"Planning {color.magenta(project.name)}.")
+
+        if subplan_cache:
+            subplan_cache.evict()
         self.enforce_precedence_constraints(plan, projects)
         plan.fill_empty()
 
         self.plan = plan
 
-    def derive_schedules(self) -> None:
+    def derive_schedules(self, parallel: bool = False) -> None:
         """
         Use information obtained from the declaration and the derived plan to derive,
           in turn, the schedules.
         """
+        schedules = Schedules()
+        for date, schedule in self.derive_schedules_iter(parallel=parallel):
+            schedules[date] = schedule
+        self.schedules = schedules
+
+    def derive_schedules_iter(
+        self, parallel: bool = False, max_workers: Optional[int] = None
+    ) -> Iterator[tuple[NKDate, Schedule]]:
+        """
+        Derives the schedules one day at a time, yielding each as soon as it is final. Entries
+          that do not fit into a day are carried over to the next one internally.
+
+        With `parallel`, the schedule of every day is first derived without carry-over in a
+          pool of worker processes (see `derive_base_schedule`). The sequential pass then takes
+          over these base schedules for days receiving no excess and only re-derives the days
+          that do, so the schedules are identical; the days receiving excess are thus computed
+          twice. Only about `2 * max_workers` days are submitted ahead of the day being
+          scheduled, so long date ranges do not pile up finished schedules in memory.
+        """
         start_date_new, end_date_new = self.start_and_end_dates
         print(start_date_new, end_date_new)
-        schedules, excess_entries = Schedules(), Entries()
+        excess_entries = Entries()
         # ----
         # end_date_new = NKDate.from_string("2023-12-31")  # FIXME
         # ----
-        for date in start_date_new.range(end_date_new):
-            print(f"Scheduling {color.cyan(str(date))}.")
-            schedule = Schedule.from_calendar(self.calendar, date)
-            # TODO: add .earliest and .latest to entries
-
-            schedules[date], excess_entries = add_from_plan_and_excess(
-                schedule, self.plan, excess_entries
+        dates = start_date_new.range(end_date_new)
+        pool_context: ContextManager[Optional[ProcessPoolExecutor]] = contextlib.nullcontext()
+        if parallel:
+            pool_context = ProcessPoolExecutor(max_workers)
+        with pool_context as pool:
+            base_schedules = (
+                self._iter_base_schedules(pool, dates, 2 * (max_workers or os.cpu_count() or 1))
+                if pool
+                else itertools.repeat(None)
             )
-        self.schedules = schedules
+            for date, base_schedule in zip(dates, base_schedules):
+                print(f"Scheduling {color.cyan(str(date))}.")
+                if base_schedule is not None and not excess_entries:
+                    schedule, excess_entries = base_schedule.result()
+                    yield date, schedule
+                    continue
+                schedule = Schedule.from_calendar(self.calendar, date)
+                # TODO: add .earliest and .latest to entries
+
+                schedule, excess_entries = add_from_plan_and_excess(
+                    schedule, self.plan, excess_entries
+                )
+                yield date, schedule
+
+    def _iter_base_schedules(
+        self, pool: ProcessPoolExecutor, dates: Iterable[NKDate], window: int
+    ) -> Iterator[Optional["Future[tuple[Schedule, Entries]]"]]:
+        """
+        Yields the futures of the base schedules of the given dates in order, submitting the
+          next date whenever one is consumed so that at most `window` are in flight.
+        """
+        dates_iter = iter(dates)
+        pending = deque(
+            self._submit_base_schedule(pool, date) for date in itertools.islice(dates_iter, window)
+        )
+        while pending:
+            yield pending.popleft()
+            for date in itertools.islice(dates_iter, 1):
+                pending.append(self._submit_base_schedule(pool, date))
+
+    def _submit_base_schedule(
+        self, pool: ProcessPoolExecutor, date: NKDate
+    ) -> Optional["Future[tuple[Schedule, Entries]]"]:
+        """
+        Submits the derivation of a day's schedule without carry-over, unless the day is missing
+          from the calendar or the plan (the sequential pass then reports the error).
+        """
+        if self.plan is None or date not in self.plan or date not in self.calendar:
+            return None
+        return pool.submit(derive_base_schedule, date, self.calendar[date].entries, self.plan[date])
 
     @property
     def start_and_end_dates(self) -> tuple[NKDate, NKDate]:
@@ -145,28 +255,13 @@ class NebokraiEntryPoint:
     def enforce_precedence_constraints(plan: Plan, projects: Projects) -> None:
         """
         Checks that all temporal dependencies are respected and raises an informative
-          error if that is not the case.
+          error listing every violation if that is not the case.
         """
-        inverse_plan = plan.inverse
-
-        def get_last_date(_id: Union[TaskID, ProjectID]) -> NKDate:
-            if isinstance(_id, ProjectID):
-                return max(map(lambda t: inverse_plan[t], (projects[_id])))
-            if isinstance(_id, TaskID):
-                return inverse_plan[projects.get_task(_id)]
-            raise ValueError(f"Invalid key for inverse plan [dict]: {_id} [{type(_id)}]")
-
-        for task in filter(lambda t: bool(t.dependencies), projects.tasks):
-            limiting_dep = projects.get_task(max(task.dependencies, key=get_last_date))
-            if (plan_date := inverse_plan[task]) >= (earliest := inverse_plan[limiting_dep] + 1):
-                continue
+        violations = DependencyGraph(projects).violations(plan)
+        if violations:
             raise ValueError(
-                (
-                    f"Task {'<>'.join(task.task_id)} assigned to {plan_date}, "
-                    f"but earliest permissible date is {earliest}."
-                    "  Please adjust the declaration and run the derivation again. \n  "
-                    f"  Limiting dependency: {limiting_dep}."
-                )
+                "\n  ".join(map(str, violations))
+                + "\n  Please adjust the declaration and run the derivation again."
             )
 
     def save_derivation(self) -> None:
@@ -186,17 +281,39 @@ class NebokraiEntryPoint:
         with open(self.path_manager.txt_gantt, "w", encoding="utf-8") as f:
             f.write(self.plan.gantt_view)
 
-    def save_schedules(self) -> None:
+    def save_schedules(self, schedules: Optional[Iterable[tuple[NKDate, Schedule]]] = None) -> None:
         """
         Writes schedules to $NEBOKRAI_ROOT/derivation/schedules.json and backs up the last
-          schedules file.
+          schedules file. If an iterable of schedules is given (e.g. `derive_schedules_iter()`),
+          each schedule is written as it arrives instead of the derived `self.schedules`. Both
+          files are written to temporary files next to them first and only replace the previous
+          files (and the backup) once all schedules are written, so an error during derivation
+          leaves them untouched.
         """
-        assert self.schedules is not None
-        os.rename(self.path_manager.schedules, self.path_manager.schedules_backup)
-        with open(self.path_manager.schedules, "w", encoding="utf-8") as f:
-            json.dump(self.schedules.serializes(), f, ensure_ascii=False, indent=4)
-        with open(self.path_manager.txt_schedules, "w", encoding="utf-8") as f:
-            f.write(str(self.schedules))
+        if schedules is None:
+            assert self.schedules is not None
+            schedules = self.schedules.items()
+        path, txt_path = self.path_manager.schedules, self.path_manager.txt_schedules
+        tmp_path, tmp_txt_path = path.with_suffix(".json.tmp"), txt_path.with_suffix(".txt.tmp")
+        try:
+            with (
+                open(tmp_path, "w", encoding="utf-8") as f,
+                open(tmp_txt_path, "w", encoding="utf-8") as f_txt,
+            ):
+
+                def serialize_and_write_txt() -> Iterator[ScheduleDictRaw]:
+                    for i, (_, schedule) in enumerate(schedules):  # type: ignore
+                        f_txt.write(("\n" if i else "") + str(schedule))
+                        yield schedule.serialize()
+
+                dump_json_list(serialize_and_write_txt(), f)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            tmp_txt_path.unlink(missing_ok=True)
+            raise
+        os.rename(path, self.path_manager.schedules_backup)
+        os.replace(tmp_path, path)
+        os.replace(tmp_txt_path, txt_path)
 
     def open_plan(self) -> None:
         self.plan = Plan.from_derivation(path_manager)
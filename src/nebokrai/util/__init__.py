@@ -1,12 +1,14 @@
 from . import color
 from .display import tabularize, wrap_string
 from .entity_ids import ProjectID, RoadmapID, TaskID
-from .misc import round5
-from .nkdatetime import NKDate, NKTime
+from .misc import round5, stable_hash
+from .nkdatetime import DateRange, DateSet, NKDate, NKTime, RecurrenceRule
 from .prompt import PromptConfig, prompt_any
 from .shift_declaration import shift_declaration_ndays
 
 __all__ = [
+    "DateRange",
+    "DateSet",
     "NKDate",
     "NKTime",
     "ProjectID",
@@ -14,9 +16,11 @@ __all__ = [
     "TaskID",
     "color",
     "PromptConfig",
+    "RecurrenceRule",
     "prompt_any",
     "round5",
     "shift_declaration_ndays",
+    "stable_hash",
     "tabularize",
     "wrap_string",
 ]
@@ -1,15 +1,141 @@
-from typing import NamedTuple
+from typing import Any, Iterator, Optional, Union
 
 from nebokrai.util import color
 
+IDKey = tuple[str, ...]
 
-class RoadmapID(NamedTuple):
+
+class EntityID(int):
+    """
+    Base class of roadmap, project and task IDs. Every distinct ID is interned by `IDRegistry`
+      and *is* its small integer handle, so hashing is that of ints. As there is a single
+      instance per ID, an ID is equal only to itself: unlike the former tuple IDs, it is not
+      equal to the tuple of its codes, nor to its handle. Otherwise IDs behave like tuples of
+      their codes (iteration, indexing, ordering), and print as before.
+    """
+
+    __slots__ = ()
+
+    __hash__ = int.__hash__
+
+    def __eq__(self, __other: object) -> bool:
+        return self is __other
+
+    def __ne__(self, __other: object) -> bool:
+        return self is not __other
+
+    @property
+    def key(self) -> IDKey:
+        return registry.keys[self]
+
+    @property
+    def handle(self) -> int:
+        return int(self)
+
+    def parent(self) -> Optional["EntityID"]:
+        """
+        Returns the ID of the containing roadmap or project, None for roadmaps.
+        """
+        return registry.parent(self)
+
+    def __reduce__(self) -> tuple:
+        return type(self), self.key
+
+    def __bool__(self) -> bool:
+        return True
+
+    def __lt__(self, __other: Union["EntityID", IDKey]) -> bool:  # type: ignore
+        return self.key < (__other.key if isinstance(__other, EntityID) else __other)
+
+    def __le__(self, __other: Union["EntityID", IDKey]) -> bool:  # type: ignore
+        return self.key <= (__other.key if isinstance(__other, EntityID) else __other)
+
+    def __gt__(self, __other: Union["EntityID", IDKey]) -> bool:  # type: ignore
+        return self.key > (__other.key if isinstance(__other, EntityID) else __other)
+
+    def __ge__(self, __other: Union["EntityID", IDKey]) -> bool:  # type: ignore
+        return self.key >= (__other.key if isinstance(__other, EntityID) else __other)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.key)
+
+    def __len__(self) -> int:
+        return len(self.key)
+
+    def __getitem__(self, __index: Any) -> Any:
+        return self.key[__index]
+
+    def __format__(self, __format_spec: str) -> str:
+        return format(str(self), __format_spec)
+
+
+class IDRegistry:
+    """
+    Interns entity IDs. Each distinct ID is created once and numbered with a small integer
+      handle; `keys` maps handles to the codes of the ID, `ids` to the ID itself, and `parents`
+      to the handle of the ID's roadmap or project (-1 for roadmaps), so parent lookups are list
+      indexing. IDs parsed from strings are memoized as well. IDs are never released, which is
+      fine for the size of declarations.
+    """
+
+    def __init__(self) -> None:
+        self._by_key: dict[IDKey, EntityID] = {}
+        self._by_string: dict[tuple[type, str], EntityID] = {}
+        self.keys: list[IDKey] = []
+        self.ids: list[EntityID] = []
+        self.parents: list[int] = []
+
+    def intern(self, cls: type, key: IDKey) -> Any:
+        """
+        Returns the ID of the given class with the given codes, creating it (and its parents) on
+          first use.
+        """
+        if (existing := self._by_key.get(key)) is not None:
+            return existing
+        parent = PARENT_TYPES[cls](*key[:-1]) if cls in PARENT_TYPES else None
+        entity_id: EntityID = int.__new__(cls, len(self.ids))
+        self.keys.append(key)
+        self.ids.append(entity_id)
+        self.parents.append(-1 if parent is None else int(parent))
+        self._by_key[key] = entity_id
+        return entity_id
+
+    def parse(self, cls: type, s: str, codes: Any) -> Any:
+        """
+        Returns the ID of the given class for a string, splitting it with `codes` on a miss.
+        """
+        if (existing := self._by_string.get((cls, s))) is None:
+            existing = self._by_string[(cls, s)] = cls(*codes(s))
+        return existing
+
+    def parent(self, entity_id: EntityID) -> Optional[EntityID]:
+        handle = self.parents[entity_id]
+        return None if handle < 0 else self.ids[handle]
+
+    def __getitem__(self, __handle: int) -> EntityID:
+        return self.ids[__handle]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+registry = IDRegistry()
+
+
+class RoadmapID(EntityID):
     """
     Unique identifier for a roadmap, containing a roadmap code and several utility functions
       to facilitate creation and comparison of project and task IDs.
     """
 
-    roadmap: str
+    __slots__ = ()
+
+    def __new__(cls, roadmap: str) -> "RoadmapID":
+        return registry.intern(cls, (roadmap,))
+
+    @property
+    def roadmap(self) -> str:
+        return self.key[0]
 
     def project_id(self, project_code: str) -> "ProjectID":
         return ProjectID(self.roadmap, project_code)
@@ -32,26 +158,35 @@ class RoadmapID(NamedTuple):
         return f"RoadmapID('{self.roadmap}')"
 
 
-class ProjectID(NamedTuple):
+class ProjectID(EntityID):
     """
     Unique identifier for a project, containing a roadmap code, and project code, and several
       utility functions to facilitate creation and comparison of roadmap and task IDs.
     """
 
-    roadmap: str
-    project: str
+    __slots__ = ()
+
+    def __new__(cls, roadmap: str, project: str) -> "ProjectID":
+        return registry.intern(cls, (roadmap, project))
+
+    @property
+    def roadmap(self) -> str:
+        return self.key[0]
+
+    @property
+    def project(self) -> str:
+        return self.key[1]
 
     @property
     def roadmap_id(self) -> RoadmapID:
-        return RoadmapID(self.roadmap)
+        return registry.ids[registry.parents[self]]  # type: ignore
 
     def task_id(self, task_code: str) -> "TaskID":
         return TaskID(self.roadmap, self.project, task_code)
 
     @classmethod
     def from_string(cls, s: str) -> "ProjectID":
-        roadmap, project = s.split("-")[:2]
-        return cls(roadmap, project)
+        return registry.parse(cls, s, split_project_string)
 
     def __contains__(self, __id: object) -> bool:
         if isinstance(__id, RoadmapID):
@@ -70,30 +205,41 @@ class ProjectID(NamedTuple):
         return f"ProjectID('{self.roadmap}-{self.project}')"
 
 
-class TaskID(NamedTuple):
+class TaskID(EntityID):
     """
     Unique identifier for a project, containing a roadmap code, and project code, a task code,
       and several utility functions to facilitate creation and comparison of roadmap and project
       IDs.
     """
 
-    roadmap: str
-    project: str
-    task: str
+    __slots__ = ()
+
+    def __new__(cls, roadmap: str, project: str, task: str) -> "TaskID":
+        return registry.intern(cls, (roadmap, project, task))
+
+    @property
+    def roadmap(self) -> str:
+        return self.key[0]
+
+    @property
+    def project(self) -> str:
+        return self.key[1]
+
+    @property
+    def task(self) -> str:
+        return self.key[2]
 
     @classmethod
     def from_string(cls, s: str) -> "TaskID":
-        segments = s.split("-")
-        assert len(segments) == 3, f"Invalid input to TaskID.from_string: {segments}"
-        return cls(*segments)
+        return registry.parse(cls, s, split_task_string)
 
     @property
     def roadmap_id(self) -> RoadmapID:
-        return RoadmapID(self.roadmap)
+        return registry.ids[registry.parents[self.project_id]]  # type: ignore
 
     @property
     def project_id(self) -> ProjectID:
-        return ProjectID(self.roadmap, self.project)
+        return registry.ids[registry.parents[self]]  # type: ignore
 
     def __contains__(self, __id: object) -> bool:
         if isinstance(__id, RoadmapID):
@@ -116,3 +262,17 @@ class TaskID(NamedTuple):
 
     def __repr__(self) -> str:
         return f"TaskID('{self.roadmap}-{self.project}-{self.task}')"
+
+
+PARENT_TYPES: dict[type, type] = {ProjectID: RoadmapID, TaskID: ProjectID}
+
+
+def split_project_string(s: str) -> tuple[str, str]:
+    roadmap, project = s.split("-")[:2]
+    return roadmap, project
+
+
+def split_task_string(s: str) -> list[str]:
+    segments = s.split("-")
+    assert len(segments) == 3, f"Invalid input to TaskID.from_string: {segments}"
+    return segments
@@ -1,2 +1,15 @@
+import hashlib
+
+
 def round5(number: float) -> int:
     return int(5 * round(number / 5 + 0.01))
+
+
+def stable_hash(*parts: object) -> int:
+    """
+    Returns a non-negative 64-bit hash of the string representations of the given parts. Unlike
+      the built-in `hash`, the result does not depend on the process (string hashing is salted
+      per process), so it can be used for derivation-relevant defaults and tie-breaking.
+    """
+    data = "\x1f".join(map(str, parts)).encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big")
@@ -1,7 +1,11 @@
-from .nkdate import NKDate
+from .nkdate import DateRange, NKDate
 from .nktime import NKTime
+from .recurrence import DateSet, RecurrenceRule
 
 __all__ = [
+    "DateRange",
+    "DateSet",
     "NKDate",
     "NKTime",
+    "RecurrenceRule",
 ]
@@ -1,53 +1,111 @@
 import re
+from collections.abc import Sequence
 from datetime import date
-from typing import Any, Union
+from functools import lru_cache
+from typing import Any, Iterator, Optional, Union, overload
+
+MIN_ORDINAL = date(1970, 1, 1).toordinal()
+
+DATE_REGEX = re.compile(r"(\d{2,4})[^\d](\d\d?)[^\d](\d\d?)")
+
+
+@lru_cache(maxsize=4096)
+def parse_date(date_str: str) -> tuple[int, tuple[int, int, int]]:
+    """
+    Parses a date string into its ordinal and (year, month, day), memoized. Strings in the
+      'YYYY-MM-DD' format are sliced directly; others are searched for a date.
+    """
+    if (
+        len(date_str) == 10
+        and date_str[4] == date_str[7] == "-"
+        and (digits := date_str[:4] + date_str[5:7] + date_str[8:]).isascii()
+        and digits.isdigit()
+    ):
+        year, month, day = int(digits[:4]), int(digits[4:6]), int(digits[6:])
+    elif result := DATE_REGEX.search(date_str):
+        year, month, day = map(int, result.groups())
+    else:
+        raise ValueError(f"Invalid string for conversion to NKDate: '{date_str}'.")
+    assert (year > 1969) and (0 < month < 13) and (0 < day < 32)
+    return date(year, month, day).toordinal(), (year, month, day)
 
 
 class NKDate:
     """
     Bespoke date class designed to simplify the nebokrai codebase.
+
+    Dates are stored as their proleptic Gregorian ordinal (as in `datetime.date.toordinal`), so
+      arithmetic, hashing and comparisons are integer operations; year, month and day are only
+      computed when first needed. When interning is enabled (see `set_interning`), dates created
+      from ordinals or strings share one instance per day, whose year, month and day setters
+      then raise an AttributeError; such dates must be copied before being modified.
     """
 
-    date_regex: re.Pattern = re.compile(r"(\d{2,4})[^\d](\d\d?)[^\d](\d\d?)")
+    __slots__ = ("_ordinal", "_fields")
+
+    date_regex: re.Pattern = DATE_REGEX
+    _interned: Optional[dict[int, "NKDate"]] = None
 
     def __init__(self, year: int, month: int, day: int) -> None:
-        assert (year > 1969) and (month in range(1, 13)) and (day in range(1, 32))
-        self._year = year
-        self._month = month
-        self._day = day
-        self._date = date(year, month, day)
+        assert (year > 1969) and (0 < month < 13) and (0 < day < 32)
+        self._ordinal: int = date(year, month, day).toordinal()
+        self._fields: Optional[tuple[int, int, int]] = (year, month, day)
+
+    def _ymd(self) -> tuple[int, int, int]:
+        if self._fields is None:
+            d = date.fromordinal(self._ordinal)
+            self._fields = (d.year, d.month, d.day)
+        return self._fields
+
+    def _replace(self, year: int, month: int, day: int) -> None:
+        if NKDate._interned is not None and NKDate._interned.get(self._ordinal) is self:
+            raise AttributeError(f"Interned date {self} is shared and cannot be modified; copy it.")
+        self._ordinal = date(year, month, day).toordinal()
+        self._fields = (year, month, day)
 
     @property
     def year(self) -> int:
-        return self._year
+        return self._ymd()[0]
 
     @year.setter
     def year(self, year: int) -> None:
-        self._year = year
+        _, month, day = self._ymd()
+        self._replace(year, month, day)
 
     @property
     def month(self) -> int:
-        return self._month
+        return self._ymd()[1]
 
     @month.setter
     def month(self, month: int) -> None:
-        self._month = month
+        year, _, day = self._ymd()
+        self._replace(year, month, day)
 
     @property
     def day(self) -> int:
-        return self._day
+        return self._ymd()[2]
 
     @day.setter
     def day(self, day: int) -> None:
-        self._day = day
+        year, month, _ = self._ymd()
+        self._replace(year, month, day)
 
     def copy(self):
-        return NKDate(self.year, self.month, self.day)
+        new = object.__new__(NKDate)
+        new._ordinal = self._ordinal
+        new._fields = self._fields
+        return new
+
+    @classmethod
+    def set_interning(cls, enabled: bool = True) -> None:
+        """
+        Enables (or disables and clears) the table sharing one instance per day.
+        """
+        NKDate._interned = {} if enabled else None
 
     @classmethod
     def today(cls) -> "NKDate":
-        d = date.today()
-        return cls(d.year, d.month, d.day)
+        return cls.fromordinal(date.today().toordinal())
 
     @classmethod
     def from_string(cls, date_str: str) -> "NKDate":
@@ -55,35 +113,45 @@ class NKDate:
             raise TypeError(
                 f"Invalid type for NKDate.from_string: '{type(date_str)}' (value: '{date_str}')."
             )
-        result = re.search(cls.date_regex, str(date_str))
-        if result:
-            year, month, day = map(int, result.groups())
-            return cls(year, month, day)
-        raise ValueError(f"Invalid string for conversion to NKDate: '{date_str}'.")
+        ordinal, fields = parse_date(date_str)
+        if NKDate._interned is not None and ordinal in NKDate._interned:
+            return NKDate._interned[ordinal]
+        new = object.__new__(NKDate)
+        new._ordinal = ordinal
+        new._fields = fields
+        if NKDate._interned is not None:
+            NKDate._interned[ordinal] = new
+        return new
 
     def toordinal(self) -> int:
-        return self._date.toordinal()
+        return self._ordinal
 
     @classmethod
     def fromordinal(cls, __ord: int) -> "NKDate":
-        d = date.fromordinal(__ord)
-        return cls(d.year, d.month, d.day)
+        if NKDate._interned is not None and __ord in NKDate._interned:
+            return NKDate._interned[__ord]
+        assert __ord >= MIN_ORDINAL
+        new = object.__new__(NKDate)
+        new._ordinal = __ord
+        new._fields = None
+        if NKDate._interned is not None:
+            NKDate._interned[__ord] = new
+        return new
 
     def weekday(self) -> int:
-        return self._date.weekday()
+        return (self._ordinal - 1) % 7
 
     def daysto(self, date2: "NKDate") -> int:
-        return date2.toordinal() - self.toordinal()
+        return date2.toordinal() - self._ordinal
 
     def __int__(self) -> int:
-        return self.toordinal()
+        return self._ordinal
 
     def __add__(self, days: int) -> "NKDate":
-        d = date.fromordinal(self.toordinal() + int(days))
-        return NKDate(d.year, d.month, d.day)
+        return NKDate.fromordinal(self._ordinal + int(days))
 
     def __sub__(self, days: int) -> "NKDate":  # type: ignore
-        return NKDate.fromordinal(self.toordinal() - int(days))
+        return NKDate.fromordinal(self._ordinal - int(days))
 
     def pretty(self) -> str:
         """
@@ -125,40 +193,30 @@ class NKDate:
         ending = ordinal_endings.get(self.day, "th")
         return f"{days[self.weekday()]}, {months[self.month]} {self.day}{ending}, {self.year}"
 
-    def range(self, end: Union["NKDate", int], inclusive: bool = True) -> list["NKDate"]:
+    def range(self, end: Union["NKDate", int], inclusive: bool = True) -> "DateRange":
         """
-        Returns a list of consecutive days, default inclusive. Supports reverse-order ranges.
+        Returns the consecutive days from this date to `end` (a date or a number of days), default
+          inclusive. Supports reverse-order ranges. The dates are only created when accessed.
         """
         inclusive = inclusive and (self != end) and (end != 0)
 
-        date1 = self.copy()
-        if isinstance(end, int):
-            date2 = date1 + end
-        else:
-            date2 = end
+        ord1 = self._ordinal
+        ord2 = ord1 + end if isinstance(end, int) else end.toordinal()
 
         reverse: bool = False
 
-        if date1 > date2:
-            date1, date2 = date2, date1
+        if ord1 > ord2:
+            ord1, ord2 = ord2, ord1
             reverse = True
 
         if not inclusive:
             if not reverse:
-                date2 -= 1
+                ord2 -= 1
             else:
-                date1 += 1
-
-        date_i = date1
-        dates = [date_i]
+                ord1 += 1
 
-        while date_i < date2:
-            dates.append(date_i := date_i + 1)
-
-        if reverse:
-            dates.reverse()
-
-        return dates
+        ordinals = range(ord1, max(ord1, ord2) + 1)
+        return DateRange(ordinals[::-1] if reverse else ordinals)
 
     @classmethod
     def tomorrow(cls) -> "NKDate":
@@ -169,39 +227,48 @@ class NKDate:
         return NoneDate()
 
     def __hash__(self) -> int:
-        return hash((self.year, self.month, self.day))
+        return hash(self._ordinal)
 
     def __eq__(self, __other: object) -> bool:
-        if not isinstance(__other, (date, NKDate)):
-            return False
-        return (self.year, self.month, self.day) == (
-            __other.year,
-            __other.month,
-            __other.day,
-        )
+        if type(__other) is NKDate:
+            return self._ordinal == __other._ordinal
+        if isinstance(__other, NKDate):
+            return __other == self
+        if isinstance(__other, date):
+            return self._ordinal == __other.toordinal()
+        return False
 
     def __lt__(self, __other: Any) -> bool:
+        if type(__other) is NKDate:
+            return self._ordinal < __other._ordinal
         if isinstance(__other, NoneDate):
             return False
-        return self.__int__() < int(__other)
+        return self._ordinal < int(__other)
 
     def __gt__(self, __other: Any) -> bool:
+        if type(__other) is NKDate:
+            return self._ordinal > __other._ordinal
         if isinstance(__other, NoneDate):
             return False
-        return self.__int__() > int(__other)
+        return self._ordinal > int(__other)
 
     def __le__(self, __other: Any) -> bool:
+        if type(__other) is NKDate:
+            return self._ordinal <= __other._ordinal
         if isinstance(__other, NoneDate):
             return False
-        return self.__int__() <= int(__other)
+        return self._ordinal <= int(__other)
 
     def __ge__(self, __other: Any) -> bool:
+        if type(__other) is NKDate:
+            return self._ordinal >= __other._ordinal
         if isinstance(__other, NoneDate):
             return False
-        return self.__int__() >= int(__other)
+        return self._ordinal >= int(__other)
 
     def __str__(self) -> str:
-        return f"{self.year}-{self.month:0>2}-{self.day:0>2}"
+        year, month, day = self._ymd()
+        return f"{year}-{month:0>2}-{day:0>2}"
 
     def __repr__(self) -> str:
         return f"NKDate({self.__str__()})"
@@ -212,6 +279,8 @@ class NoneDate(NKDate):
     Empty date for cases where this may be superior to using None
     """
 
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(1970, 1, 1)
 
@@ -238,3 +307,81 @@ class NoneDate(NKDate):
 
     def __repr__(self) -> str:
         return self.__str__()
+
+
+class DateRange(Sequence[NKDate]):
+    """
+    Immutable sequence of consecutive dates (ascending or descending), backed by a `range` of
+      ordinals: length, membership, indexing and slicing are O(1), and dates are only created
+      when accessed. Compares equal to lists and tuples holding the same dates.
+    """
+
+    __slots__ = ("ordinals",)
+
+    def __init__(self, ordinals: range) -> None:
+        assert abs(ordinals.step) == 1
+        self.ordinals = ordinals
+
+    @property
+    def first(self) -> Optional[NKDate]:
+        return NKDate.fromordinal(self.ordinals[0]) if self.ordinals else None
+
+    @property
+    def last(self) -> Optional[NKDate]:
+        return NKDate.fromordinal(self.ordinals[-1]) if self.ordinals else None
+
+    def __len__(self) -> int:
+        return len(self.ordinals)
+
+    def __contains__(self, __date: object) -> bool:
+        if not isinstance(__date, NKDate) or isinstance(__date, NoneDate):
+            return False
+        return __date.toordinal() in self.ordinals
+
+    @overload
+    def __getitem__(self, __index: int) -> NKDate:
+        ...
+
+    @overload
+    def __getitem__(self, __index: slice) -> "DateRange":
+        ...
+
+    def __getitem__(self, __index: Union[int, slice]) -> Union[NKDate, "DateRange"]:
+        if isinstance(__index, slice):
+            ordinals = self.ordinals[__index]
+            if abs(ordinals.step) != 1:
+                raise ValueError("DateRange slices must have a step of 1 or -1.")
+            return DateRange(ordinals)
+        return NKDate.fromordinal(self.ordinals[__index])
+
+    def __iter__(self) -> Iterator[NKDate]:
+        return map(NKDate.fromordinal, self.ordinals)
+
+    def __reversed__(self) -> Iterator[NKDate]:
+        return map(NKDate.fromordinal, reversed(self.ordinals))
+
+    def index(self, __date: Any, __start: int = 0, __stop: Optional[int] = None) -> int:
+        if __date not in self:
+            raise ValueError(f"{__date} is not in range.")
+        index = self.ordinals.index(__date.toordinal())
+        if index < __start or (__stop is not None and index >= __stop):
+            raise ValueError(f"{__date} is not in range.")
+        return index
+
+    def count(self, __date: Any) -> int:
+        return int(__date in self)
+
+    def __eq__(self, __other: object) -> bool:
+        if isinstance(__other, DateRange):
+            return self.ordinals == __other.ordinals
+        if isinstance(__other, (list, tuple)):
+            return len(self) == len(__other) and all(map(NKDate.__eq__, self, __other))
+        return False
+
+    __hash__ = None  # type: ignore
+
+    def __str__(self) -> str:
+        return f"{self.first}..{self.last}" if self.ordinals else "[]"
+
+    def __repr__(self) -> str:
+        return f"DateRange({self.__str__()})"
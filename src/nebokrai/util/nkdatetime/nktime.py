@@ -1,65 +1,98 @@
+from functools import lru_cache
 from typing import Any, Optional
 
+MINUTES_PER_DAY = 24 * 60
+
+
+@lru_cache(maxsize=4096)
+def parse_time(time_string: str) -> Optional[int]:
+    """
+    Parses a time string into minutes since 00:00 (None for 'none...' strings), memoized.
+      Strings in the 'HH:MM' format are sliced directly; others are split at the colon.
+    """
+    if len(time_string) == 5 and time_string[2] == ":":
+        hour_string, minute_string = time_string[:2], time_string[3:]
+    else:
+        if time_string.lower().startswith("none"):
+            return None
+        substrings = time_string.split(":")
+        if not len(substrings) == 2:
+            raise ValueError(
+                "Argument to NKTime.from_string must have exactly one colon."
+                f" Given: '{time_string}'."
+            )
+        hour_string, minute_string = substrings
+    hour, minute = int(hour_string), int(minute_string)
+    if not ((hour >= 0) and (minute >= 0) and (60 * hour + minute <= MINUTES_PER_DAY)):
+        raise ValueError("Time must be within 00:00..24:00")
+    return 60 * hour + minute
+
 
 class NKTime:
     """
     Bespoke time class designed to simplify the nebokrai codebase.
+
+    Times are immutable and stored as a single count of minutes since 00:00, so comparisons and
+      differences are integer operations. `fromminutes` and arithmetic return shared instances
+      from a precomputed table of all times of the day.
     """
 
+    __slots__ = ("_minutes", "isblank")
+
     def __init__(self, hour: int = 0, minute: int = 0, isblank: bool = False):
-        if not ((hour >= 0) and (minute >= 0) and (60 * hour + minute) in range(1441)):
+        minutes = 60 * hour + minute
+        if not ((hour >= 0) and (minute >= 0) and (minutes <= MINUTES_PER_DAY)):
             raise ValueError("Time must be within 00:00..24:00")
-        self.hour = hour
-        self.minute = minute
+        self._minutes = minutes
         self.isblank = isblank
 
+    @property
+    def hour(self) -> int:
+        return self._minutes // 60
+
+    @property
+    def minute(self) -> int:
+        return self._minutes % 60
+
     @classmethod
     def from_string(cls, time_string: Optional[str]) -> "NKTime":
         if not isinstance(time_string, str):
             raise ValueError(
                 f"Argument to NKTime.from_string must be str, not '{type(time_string)}'."
             )
-        if time_string.lower().startswith("none"):
-            return NKTime.nonetime()
-        substrings = time_string.split(":")
-        if not len(substrings) == 2:
-            raise ValueError(
-                "Argument to NKTime.from_string must have exactly one colon."
-                f" Given: '{time_string}'."
-            )
-        hour, minute = map(int, substrings)
-        return cls(hour, minute)
+        minutes = parse_time(time_string)
+        return NKTime.nonetime() if minutes is None else TIMES[minutes]
 
     def __bool__(self):
         return not self.isblank
 
     def copy(self):
-        return NKTime(self.hour, self.minute)
+        return TIMES[self._minutes]
 
     def tominutes(self) -> int:
-        return 60 * self.hour + self.minute
+        return self._minutes
 
     @classmethod
     def fromminutes(cls, mins: int) -> "NKTime":
-        return cls(*divmod(mins, 60))
+        if 0 <= mins <= MINUTES_PER_DAY:
+            return TIMES[mins]
+        raise ValueError("Time must be within 00:00..24:00")
 
     @staticmethod
     def nonetime() -> "NoneTime":
-        return NoneTime()
+        return NONE_TIME
 
     def timeto(self, time2: "NKTime") -> int:
-        t2, t1 = time2.tominutes(), self.tominutes()
-        return t2 - t1
+        return time2._minutes - self._minutes
 
     def timefrom(self, time2: "NKTime") -> int:
-        t2, t1 = self.tominutes(), time2.tominutes()
-        return t2 - t1
+        return self._minutes - time2._minutes
 
     def __add__(self, mins: int) -> "NKTime":
-        return NKTime.fromminutes(min(1440, max(0, self.tominutes() + mins)))
+        return TIMES[min(MINUTES_PER_DAY, max(0, self._minutes + mins))]
 
     def __sub__(self, mins: int) -> "NKTime":
-        return NKTime.fromminutes(min(1440, max(0, self.tominutes() - mins)))
+        return TIMES[min(MINUTES_PER_DAY, max(0, self._minutes - mins))]
 
     def __str__(self) -> str:
         return f"{self.hour:0>2}:{self.minute:0>2}"
@@ -69,27 +102,36 @@ class NKTime:
 
     def __eq__(self, nktime2: Any) -> bool:
         if isinstance(nktime2, NKTime):
-            return self.tominutes() == nktime2.tominutes()
+            return self._minutes == nktime2._minutes
         return False
 
     def __lt__(self, nktime2: "NKTime") -> bool:
-        return self.tominutes() < nktime2.tominutes()
+        return self._minutes < nktime2._minutes
 
     def __gt__(self, nktime2: "NKTime") -> bool:
-        return self.tominutes() > nktime2.tominutes()
+        return self._minutes > nktime2._minutes
 
     def __le__(self, nktime2: "NKTime") -> bool:
-        return self.tominutes() <= nktime2.tominutes()
+        return self._minutes <= nktime2._minutes
 
     def __ge__(self, nktime2: "NKTime") -> bool:
-        return self.tominutes() >= nktime2.tominutes()
+        return self._minutes >= nktime2._minutes
 
 
 class NoneTime(NKTime):
     """
-    Empty time for cases where this may be superior to using None
+    Empty time for cases where this may be superior to using None. There is a single instance,
+      `NONE_TIME`.
     """
 
+    __slots__ = ()
+    _instance: Optional["NoneTime"] = None
+
+    def __new__(cls) -> "NoneTime":
+        if NoneTime._instance is None:
+            NoneTime._instance = super().__new__(cls)
+        return NoneTime._instance
+
     def __init__(self) -> None:
         super().__init__()
 
@@ -97,10 +139,10 @@ class NoneTime(NKTime):
         return False
 
     def __add__(self, _: Any) -> "NoneTime":
-        return NoneTime()
+        return self
 
     def __sub__(self, _: Any) -> "NoneTime":
-        return NoneTime()
+        return self
 
     def __eq__(self, __other: Any) -> bool:
         return isinstance(__other, NoneTime)
@@ -122,3 +164,9 @@ class NoneTime(NKTime):
 
     def __str__(self) -> str:
         return "XX:XX"
+
+
+TIMES = [NKTime(*divmod(minutes, 60)) for minutes in range(MINUTES_PER_DAY + 1)]
+MIDNIGHT = TIMES[0]
+END_OF_DAY = TIMES[MINUTES_PER_DAY]
+NONE_TIME = NoneTime()
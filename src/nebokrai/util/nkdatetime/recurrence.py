@@ -0,0 +1,131 @@
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Optional
+
+from .nkdate import NKDate
+
+if TYPE_CHECKING:
+    from ..serde.custom_dict_types import RecurrenceRuleDictRaw
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+class DateSet:
+    """
+    Set of dates within a fixed horizon (first to last date, inclusive), stored as a bitmap
+      with one byte per day, so that membership checks are a single index operation.
+    """
+
+    def __init__(self, first: NKDate, last: NKDate, dates: Iterable[NKDate] = ()) -> None:
+        self.first = first
+        self.last = last
+        self._offset = first.toordinal()
+        self._bitmap = bytearray(max(0, last.toordinal() - self._offset + 1))
+        for date in dates:
+            self.add(date)
+
+    @classmethod
+    def from_predicate(
+        cls, first: NKDate, last: NKDate, predicate: Callable[[NKDate], bool]
+    ) -> "DateSet":
+        return cls(first, last, filter(predicate, first.range(last)))
+
+    @classmethod
+    def from_dates(cls, dates: Iterable[NKDate]) -> "DateSet":
+        dates = list(dates)
+        if not dates:
+            return cls(NKDate(1970, 1, 2), NKDate(1970, 1, 1))
+        return cls(min(dates), max(dates), dates)
+
+    def add(self, date: NKDate) -> None:
+        index = date.toordinal() - self._offset
+        if not 0 <= index < len(self._bitmap):
+            raise ValueError(f"Date {date} outside of horizon {self.first}..{self.last}.")
+        self._bitmap[index] = 1
+
+    def discard(self, date: NKDate) -> None:
+        index = date.toordinal() - self._offset
+        if 0 <= index < len(self._bitmap):
+            self._bitmap[index] = 0
+
+    def __contains__(self, __date: object) -> bool:
+        if not isinstance(__date, NKDate):
+            return False
+        index = __date.toordinal() - self._offset
+        return 0 <= index < len(self._bitmap) and bool(self._bitmap[index])
+
+    def __iter__(self) -> Iterator[NKDate]:
+        for index, flag in enumerate(self._bitmap):
+            if flag:
+                yield NKDate.fromordinal(self._offset + index)
+
+    def __len__(self) -> int:
+        return self._bitmap.count(1)
+
+    def __bool__(self) -> bool:
+        return 1 in self._bitmap
+
+    @property
+    def start(self) -> Optional[NKDate]:
+        """
+        Earliest date in the set, if any.
+        """
+        index = self._bitmap.find(1)
+        return None if index < 0 else NKDate.fromordinal(self._offset + index)
+
+    @property
+    def end(self) -> Optional[NKDate]:
+        """
+        Latest date in the set, if any.
+        """
+        index = self._bitmap.rfind(1)
+        return None if index < 0 else NKDate.fromordinal(self._offset + index)
+
+
+class RecurrenceRule:
+    """
+    Rule selecting dates within a date range: every day, or the days matching the given
+      weekdays and/or days of the month, except for explicitly excluded dates.
+    """
+
+    def __init__(
+        self,
+        start: NKDate,
+        end: NKDate,
+        weekdays: Optional[Iterable[int]] = None,
+        monthdays: Optional[Iterable[int]] = None,
+        exceptions: Iterable[NKDate] = (),
+    ) -> None:
+        if end < start:
+            raise ValueError(f"Recurrence rule ends ({end}) before it starts ({start}).")
+        self.start = start
+        self.end = end
+        self.weekdays = set(weekdays) if weekdays is not None else None
+        self.monthdays = set(monthdays) if monthdays is not None else None
+        self.exceptions = set(exceptions)
+
+    @classmethod
+    def deserialize(cls, rule_dict: "RecurrenceRuleDictRaw") -> "RecurrenceRule":
+        """
+        Creates instance from dict, intended to be used with .json declaration format.
+        """
+        weekdays = rule_dict.get("weekdays")
+        return cls(
+            NKDate.from_string(rule_dict["start"]),
+            NKDate.from_string(rule_dict["end"]),
+            weekdays=None if weekdays is None else map(WEEKDAYS.index, weekdays),
+            monthdays=rule_dict.get("monthdays"),
+            exceptions=map(NKDate.from_string, rule_dict.get("except", [])),
+        )
+
+    def matches(self, date: NKDate) -> bool:
+        return (
+            (self.start <= date <= self.end)
+            and (self.weekdays is None or date.weekday() in self.weekdays)
+            and (self.monthdays is None or date.day in self.monthdays)
+            and date not in self.exceptions
+        )
+
+    def compile(self) -> DateSet:
+        """
+        Expands the rule into the set of matching dates.
+        """
+        return DateSet.from_predicate(self.start, self.end, self.matches)
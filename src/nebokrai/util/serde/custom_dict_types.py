@@ -153,6 +153,7 @@ class RoutineDictRaw(TypedDict):
     default_blocks: str
     default_order: float
     items: list["RoutineItemDictRaw"]
+    valid: NotRequired["RecurrenceRuleDictRaw"]
 
 
 class RoutineDictParsed(TypedDict):
@@ -317,7 +318,7 @@ class PromptDispatcherType(TypedDict):
 #     """
 
 #     days: dict[str, "DayDictRaw"]
-CalendarDictRaw = dict[str, "DayDictRaw"]
+CalendarDictRaw = dict[str, Union["DayDictRaw", list["RecurringDaysDictRaw"]]]
 CalendarDictParsed = dict[NKDate, "DayDictParsed"]
 
 
@@ -338,6 +339,29 @@ class DayDictRaw(TypedDict):
     entries: list["EntryDictRaw"]
 
 
+# Recurrence rule, selecting dates from a date range by weekday and/or day of the month (the
+#   functional syntax is needed since 'except' is a keyword).
+RecurrenceRuleDictRaw = TypedDict(
+    "RecurrenceRuleDictRaw",
+    {
+        "start": str,
+        "end": str,
+        "weekdays": NotRequired[list[WeekdayLiteral]],
+        "monthdays": NotRequired[list[int]],
+        "except": NotRequired[list[str]],
+    },
+)
+
+
+class RecurringDaysDictRaw(RecurrenceRuleDictRaw):
+    """
+    Data type corresponding to an entry of the 'recurring' list of a 'calendar' subdict of a
+      declaration.json file: a day declaration applying to all dates matching a rule.
+    """
+
+    day: DayDictRaw
+
+
 class DayDictParsed(TypedDict):
     start: NKTime
     end: NKTime
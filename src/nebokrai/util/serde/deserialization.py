@@ -1,4 +1,4 @@
-from typing import Iterable, Union
+from typing import Iterable, Union, cast
 
 from nebokrai.util import color
 
@@ -98,7 +98,11 @@ def parse_activity_dict(activity_dict: ActivityDictRaw) -> ActivityDictParsed:
 
 
 def parse_calendar_dict(calendar_dict: CalendarDictRaw) -> CalendarDictParsed:
-    return {NKDate.from_string(k): parse_calendar_day(v) for k, v in calendar_dict.items()}
+    return {
+        NKDate.from_string(k): parse_calendar_day(cast(DayDictRaw, v))
+        for k, v in calendar_dict.items()
+        if k != "recurring"
+    }
 
 
 def parse_calendar_day(day_dict: DayDictRaw) -> DayDictParsed:
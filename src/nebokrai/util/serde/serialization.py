@@ -0,0 +1,18 @@
+import json
+from typing import Any, Iterable, TextIO
+
+
+def dump_json_list(items: Iterable[Any], fp: TextIO, indent: int = 4) -> None:
+    """
+    Writes the items to `fp` as a JSON array, one item at a time, so that the items need not
+      all be held in memory. The output is identical to that of
+      `json.dump(list(items), fp, ensure_ascii=False, indent=indent)`.
+    """
+    pad = indent * " "
+    empty = True
+    for item in items:
+        fp.write("[\n" if empty else ",\n")
+        empty = False
+        item_json = json.dumps(item, ensure_ascii=False, indent=indent)
+        fp.write("\n".join(pad + line for line in item_json.split("\n")))
+    fp.write("[]" if empty else "\n]")
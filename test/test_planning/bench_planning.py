@@ -0,0 +1,73 @@
+"""
+Benchmark comparing the day-by-day rollover planner (`update_plan`) with the single-pass sweep
+  planner (`sweep_plan`) on a synthetic multi-year declaration.
+
+Run with `python -m test.test_planning.bench_planning` from the repository root.
+"""
+
+import contextlib
+import io
+import random
+import time
+
+# sets NEBOKRAI_ROOT_FILE before nebokrai is imported
+from .. import conftest  # noqa: F401
+
+# isort: split
+from nebokrai.entity import Plan, sweep_plan, update_plan
+from nebokrai.util import NKDate
+
+from ..util import synthetic_calendar, synthetic_subplans
+from .test_planning_basic import make_project
+
+START = NKDate(2024, 1, 1)
+NDAYS = 3 * 365
+
+
+def run(sweep: bool, nprojects: int, ntasks: int, spread: int, seed: int = 0) -> tuple[float, dict]:
+    rng = random.Random(seed)
+    plan = Plan(synthetic_calendar(START, NDAYS, rng))
+    subplans = synthetic_subplans(START, spread, nprojects, ntasks, rng)
+    with contextlib.redirect_stdout(io.StringIO()):
+        t0 = time.perf_counter()
+        if sweep:
+            plan = sweep_plan(plan, subplans)
+        else:
+            for subplan in subplans:
+                plan = update_plan(plan, subplan)
+        elapsed = time.perf_counter() - t0
+    return elapsed, plan.serialize()
+
+
+def subplan_tight_window() -> float:
+    """
+    Times subplanning 5000 tasks into a 10-day window, the scenario of
+      `test_subplan_tight_window`, which requires the cluster size to be increased to 500.
+    """
+    project = make_project(5000, START, START + 10)
+    with contextlib.redirect_stdout(io.StringIO()):
+        t0 = time.perf_counter()
+        project.subplan
+        return time.perf_counter() - t0
+
+
+def main() -> None:
+    scenarios = {
+        "many projects, spread out": (60, 40, NDAYS // 2),
+        "long backlog": (4, 1500, 10),
+    }
+    for label, (nprojects, ntasks, spread) in scenarios.items():
+        t_roll, plan_roll = run(False, nprojects, ntasks, spread)
+        t_sweep, plan_sweep = run(True, nprojects, ntasks, spread)
+        assert plan_roll == plan_sweep, f"Plans differ for scenario '{label}'."
+        print(
+            f"{label:<28} update_plan: {t_roll:8.3f}s   sweep_plan: {t_sweep:8.3f}s   "
+            f"speedup: {t_roll / t_sweep:5.1f}x"
+        )
+    elapsed = subplan_tight_window()
+    assert elapsed < 5, f"Subplanning a tight window took {elapsed:.1f}s."
+    print(f"{'subplan, tight window':<28} {elapsed:8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
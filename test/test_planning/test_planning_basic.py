@@ -0,0 +1,82 @@
+from itertools import chain
+
+import pytest
+
+from nebokrai.entity import Project, Task, Tasks
+from nebokrai.util import NKDate, ProjectID
+
+
+def make_project(ntasks: int, start: NKDate, end: NKDate, cluster_size: int = 1) -> Project:
+    project_id = ProjectID("r", "p")
+    tasks = Tasks(
+        Task(f"Task {i}", "Project", project_id.task_id(f"t{i:05d}"), 50, 30) for i in range(ntasks)
+    )
+    return Project("Project", project_id, tasks, 50, start, end, None, cluster_size, 30)
+
+
+def test_clusters_cached() -> None:
+    project = make_project(10, NKDate(2024, 1, 1), NKDate(2024, 2, 1), cluster_size=3)
+    clusters = project.clusters
+    assert project.clusters is clusters
+    assert [len(c) for c in clusters] == [3, 3, 3, 1]
+
+    project.cluster_size = 5
+    assert [len(c) for c in project.clusters] == [5, 5]
+
+
+def test_clusters_follow_tasks() -> None:
+    project = make_project(10, NKDate(2024, 1, 1), NKDate(2024, 2, 1), cluster_size=3)
+    first = project.clusters[0][0]
+
+    project.tasks.remove(first)
+    assert [len(c) for c in project.clusters] == [3, 3, 3]
+    assert first not in chain.from_iterable(project.clusters)
+
+    project.tasks.add(first)
+    assert [len(c) for c in project.clusters] == [3, 3, 3, 1]
+    assert first in chain.from_iterable(project.clusters)
+
+    popped = project.tasks.pop(last=False)
+    assert popped not in chain.from_iterable(project.clusters)
+
+
+def test_subplan_tight_window() -> None:
+    start, end = NKDate(2024, 1, 1), NKDate(2024, 1, 11)
+    project = make_project(5000, start, end)
+
+    subplan = project.subplan
+    assert project.cluster_size == 500
+    assert len(subplan) == 10
+    assert all(start <= date < end for date in subplan)
+    assert sum(map(len, subplan.values())) == 5000
+
+
+def test_subplan_earliest_date() -> None:
+    start, end = NKDate(2024, 1, 1), NKDate(2024, 1, 21)
+    project = make_project(10, start, end, cluster_size=2)
+    for task in list(project.tasks)[4:6]:
+        task.date_earliest = NKDate(2024, 1, 15)
+
+    subplan = project.subplan
+    assert sum(map(len, subplan.values())) == 10
+    dates = sorted(subplan)
+    assert dates[:2] == [start, start + 4]
+    assert dates[2] == NKDate(2024, 1, 15)
+    assert all(date < end for date in dates)
+
+
+def test_subplan_conflicting_dates() -> None:
+    start, end = NKDate(2024, 1, 1), NKDate(2024, 2, 1)
+    project = make_project(3, start, end, cluster_size=2)
+    first, second, _ = project.tasks
+    first.date_earliest = NKDate(2024, 1, 20)
+    second.date_latest = NKDate(2024, 1, 5)
+    with pytest.raises(ValueError, match="earliest permissible date"):
+        project.subplan
+
+    project = make_project(2, start, end, cluster_size=1)
+    first, second = project.tasks
+    first.date_earliest = NKDate(2024, 1, 20)
+    second.date_latest = NKDate(2024, 1, 5)
+    with pytest.raises(ValueError):
+        project.subplan
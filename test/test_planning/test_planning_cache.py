@@ -0,0 +1,76 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from nebokrai.entity import Project, SubplanCache
+from nebokrai.entity.base import subplan_cache
+from nebokrai.util import RoadmapID
+
+
+def make_project(code: str, ntasks: int = 5, cluster_size: int = 10) -> Project:
+    project_dict = {
+        "id": code,
+        "name": f"Project {code}",
+        "priority": 50,
+        "start": "2024-01-01",
+        "cluster_size": cluster_size,
+        "tasks": [
+            {"name": f"Task {i}", "id": f"t{i}", "duration": 30, "status": "todo"}
+            for i in range(ntasks)
+        ],
+    }
+    return Project.deserialize(RoadmapID("r").project_id(code), project_dict)  # type: ignore
+
+
+def test_cache_roundtrip(tmp_path: Path) -> None:
+    cache = SubplanCache(tmp_path)
+    project = make_project("a")
+    subplan = cache.subplan(project)
+    assert len(list(tmp_path.glob("*.json"))) == 1
+
+    cached = cache.get(project)
+    assert cached is not None
+    assert list(cached) == list(subplan)
+    for date, tasks in subplan.items():
+        assert [t.task_id for t in cached[date]] == [t.task_id for t in tasks]
+        assert all(task is project.tasks[task.task_id] for task in cached[date])
+
+
+def test_cache_key() -> None:
+    key = SubplanCache.key(make_project("a"))
+    assert key == SubplanCache.key(make_project("a"))
+    assert key != SubplanCache.key(make_project("b"))
+    assert key != SubplanCache.key(make_project("a", ntasks=6))
+    assert key != SubplanCache.key(make_project("a", cluster_size=11))
+
+
+def test_cache_key_includes_version(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    cache = SubplanCache(tmp_path)
+    project = make_project("a")
+    key = cache.key(project)
+    cache.subplan(project)
+    monkeypatch.setattr(subplan_cache, "SUBPLAN_VERSION", subplan_cache.SUBPLAN_VERSION + 1)
+    assert cache.key(project) != key
+    assert cache.get(project) is None
+
+
+def test_cache_miss_on_corrupt_entry(tmp_path: Path) -> None:
+    cache = SubplanCache(tmp_path)
+    project = make_project("a")
+    cache.subplan(project)
+    cache.path(cache.key(project)).write_text("{", encoding="utf-8")  # type: ignore
+    assert cache.get(project) is None
+
+
+def test_cache_eviction(tmp_path: Path) -> None:
+    cache = SubplanCache(tmp_path, max_entries=3)
+    projects = [make_project(code) for code in "abcde"]
+    for i, project in enumerate(projects):
+        cache.subplan(project)
+        os.utime(cache.path(cache.key(project)), (i, i))  # type: ignore
+    cache.get(projects[0])
+
+    cache.evict()
+    remaining = {path.stem for path in tmp_path.glob("*.json")}
+    assert remaining == {cache.key(p) for p in (projects[0], projects[3], projects[4])}
@@ -0,0 +1,136 @@
+import random
+from itertools import groupby
+
+import pytest
+
+from nebokrai.entity import (
+    DependencyGraph,
+    Plan,
+    Project,
+    Projects,
+    Task,
+    Tasks,
+    update_plan,
+)
+from nebokrai.util import NKDate, ProjectID, TaskID
+
+from ..util import synthetic_calendar, synthetic_subplans
+
+
+def make_projects(dependencies: dict[TaskID, set]) -> Projects:
+    projects: dict[ProjectID, list[Task]] = {}
+    for task_id, deps in dependencies.items():
+        task = Task(task_id.task, task_id.project, task_id, 50, 30, dependencies=deps)
+        projects.setdefault(task_id.project_id, []).append(task)
+    return Projects(
+        [
+            Project(str(pid), pid, Tasks(tasks), 50, NKDate(2024, 1, 1), None, 1, 1, 30)
+            for pid, tasks in projects.items()
+        ]
+    )
+
+
+project_a, project_b = ProjectID("r", "a"), ProjectID("r", "b")
+a1, a2 = project_a.task_id("1"), project_a.task_id("2")
+b1, b2 = project_b.task_id("1"), project_b.task_id("2")
+
+
+def test_topological_order() -> None:
+    graph = DependencyGraph(make_projects({b2: {b1}, b1: {project_a}, a2: {a1}, a1: set()}))
+    order = graph.topological_order()
+    assert sorted(order) == sorted([a1, a2, b1, b2])
+    position = {task_id: i for i, task_id in enumerate(order)}
+    assert position[a1] < position[a2] < position[b1] < position[b2]
+    assert graph.find_cycle() is None
+
+
+def test_cycle_detection() -> None:
+    graph = DependencyGraph(make_projects({a1: {b2}, a2: set(), b1: {project_a}, b2: {b1}}))
+    cycle = graph.find_cycle()
+    assert cycle is not None
+    assert cycle[0] == cycle[-1]
+    assert {a1, b1, b2}.issubset(cycle)
+    with pytest.raises(ValueError, match="cycle"):
+        graph.topological_order()
+
+
+def test_unknown_dependency() -> None:
+    with pytest.raises(ValueError):
+        DependencyGraph(make_projects({a1: {TaskID("r", "x", "1")}}))
+
+
+def test_violations_reports_all() -> None:
+    projects = make_projects({a1: set(), a2: {a1}, b1: {project_a}, b2: {a1, b1}})
+    start = NKDate(2024, 1, 1)
+    plan = Plan(synthetic_calendar(start, 5, random.Random(0)))
+    plan[start] = Tasks([projects.get_task(a1), projects.get_task(b2)])
+    plan[start + 1] = Tasks([projects.get_task(a2), projects.get_task(b1)])
+
+    violations = DependencyGraph(projects).violations(plan)
+    assert [(v.task_id, v.dependency) for v in violations] == [
+        (b1, project_a),
+        (b2, a1),
+        (b2, b1),
+    ]
+    assert violations[0].earliest == start + 2
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_update_plan_respects_dependencies(seed: int) -> None:
+    rng = random.Random(seed)
+    start = NKDate(2024, 1, 1)
+    plan = Plan(synthetic_calendar(start, 400, rng))
+    subplans = synthetic_subplans(start, 15, 4, 25, rng)
+
+    tasks = [task for subplan in subplans for tasks_ in subplan.values() for task in tasks_]
+    tasks.sort(key=lambda t: t.task_id)
+    for i, task in enumerate(tasks):
+        candidates = [t.task_id for t in tasks[:i]]
+        ndependencies = min(len(candidates), rng.choice([0, 0, 1, 2]))
+        task.dependencies = set(rng.sample(candidates, ndependencies))
+        if rng.random() < 0.05 and task.task_id.project != "p0":
+            task.dependencies.add(ProjectID("syn", "p0"))
+
+    projects = Projects(
+        [
+            Project(pid, ProjectID("syn", pid), Tasks(ts), 50, start, None, 1, 1, 30)
+            for pid, ts in groupby(tasks, key=lambda t: t.task_id.project)
+        ]
+    )
+    subplan_by_project = {
+        next(iter(next(iter(subplan.values())))).task_id.project_id: subplan for subplan in subplans
+    }
+
+    graph = DependencyGraph(projects)
+    for project_id in graph.project_order(sorted(subplan_by_project, reverse=True)):
+        plan = update_plan(plan, subplan_by_project[project_id], graph)
+
+    assert graph.violations(plan) == []
+    assert len(plan.inverse) == len(tasks)
+
+
+def test_update_plan_unsatisfiable_dependency() -> None:
+    projects = make_projects({a1: set(), a2: set(), b1: {project_a}, b2: set()})
+    start = NKDate(2024, 1, 1)
+    plan = Plan(synthetic_calendar(start, 5, random.Random(0)))
+    plan = update_plan(plan, {start: Tasks([projects.get_task(a1)])}, DependencyGraph(projects))
+
+    subplan = {start: Tasks([projects.get_task(b1), projects.get_task(b2)])}
+    with pytest.raises(ValueError, match=f"depends on {project_a}, but {a2} is not planned"):
+        update_plan(plan, subplan, DependencyGraph(projects))
+
+
+def test_plan_project_dates() -> None:
+    projects = make_projects({a1: set(), a2: set()})
+    start = NKDate(2024, 1, 1)
+    plan = Plan(synthetic_calendar(start, 5, random.Random(0)))
+    assert plan.project_dates(project_a) == (0, None)
+
+    plan[start + 2] = Tasks([projects.get_task(a1)])
+    plan[start] = Tasks([projects.get_task(a2)])
+    assert plan.project_dates(project_a) == (2, start + 2)
+
+    plan[start + 2] = Tasks()
+    assert plan.project_dates(project_a) == (1, start)
+    plan[start + 1] = Tasks([projects.get_task(a2)])
+    assert plan.project_dates(project_a) == (1, start + 1)
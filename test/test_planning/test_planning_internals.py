@@ -0,0 +1,249 @@
+import json
+import random
+from itertools import chain
+
+import pytest
+
+from nebokrai.entity import (
+    Calendar,
+    Plan,
+    Project,
+    Projects,
+    Routine,
+    Routines,
+    Tasks,
+    sweep_plan,
+    update_plan,
+)
+from nebokrai.util import NKDate, NKTime, ProjectID
+
+from ..util import TDataPaths, synthetic_calendar, synthetic_subplans
+
+
+def plan_snapshot(plan: Plan, subplans) -> tuple:
+    assignments = {
+        str(date): [(str(task.task_id), task.block_assigned) for task in tasks]
+        for date, tasks in plan.plan_dict.items()
+        if tasks
+    }
+    task_dates = {
+        str(task.task_id): (str(task.tmpdate), str(task.original_date))
+        for subplan in subplans
+        for tasks in subplan.values()
+        for task in tasks
+    }
+    return assignments, task_dates, plan.serialize()
+
+
+@pytest.mark.parametrize("seed", range(12))
+def test_sweep_plan_matches_update_plan(seed: int) -> None:
+    snapshots = []
+    for sweep in (False, True):
+        rng = random.Random(seed)
+        start = NKDate(2024, 1, 1)
+        plan = Plan(synthetic_calendar(start, 200, rng))
+        subplans = synthetic_subplans(
+            start, rng.choice([3, 30]), rng.choice([1, 4]), rng.choice([5, 40]), rng
+        )
+        if sweep:
+            plan = sweep_plan(plan, subplans)
+        else:
+            for subplan in subplans:
+                plan = update_plan(plan, subplan)
+        snapshots.append(plan_snapshot(plan, subplans))
+
+    assert snapshots[0] == snapshots[1]
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_capacity_ledger_matches_plan(seed: int) -> None:
+    rng = random.Random(seed)
+    start = NKDate(2024, 1, 1)
+    plan = Plan(synthetic_calendar(start, 100, rng))
+    for subplan in synthetic_subplans(start, 20, 4, 40, rng):
+        plan = update_plan(plan, subplan)
+
+    for date, tasks in plan.items():
+        ledger = plan.capacity(date)
+        expected = plan.calendar[date].available_dict
+        assert plan.available(date) == expected
+        assert ledger["total"] == expected["total"] - sum(t.remaining_duration for t in tasks)
+        assert min(ledger.values()) >= 0
+
+
+def test_reverse_index_follows_tasks() -> None:
+    rng = random.Random(0)
+    start = NKDate(2024, 1, 1)
+    plan = Plan(synthetic_calendar(start, 60, rng))
+    subplans = synthetic_subplans(start, 10, 3, 30, rng)
+    for subplan in subplans:
+        plan = update_plan(plan, subplan)
+
+    for date, tasks in plan.items():
+        for task in tasks:
+            assert plan.date_of(task) == date
+            assert plan.date_of(task.task_id) == date
+    assert plan.inverse == {
+        task: plan.date_of(task) for tasks in plan.plan_dict.values() for task in tasks
+    }
+
+    moved = next(iter(plan[start]))
+    plan[start] = Tasks(filter(lambda t: t is not moved, plan[start]))
+    with pytest.raises(KeyError):
+        plan.date_of(moved)
+    plan[start + 1] = plan[start + 1] + moved
+    assert plan.date_of(moved) == start + 1
+
+
+def synthetic_projects(start: NKDate, seed: int) -> Projects:
+    rng = random.Random(seed)
+    return Projects(
+        [
+            Project(
+                f"Project {i}",
+                ProjectID("syn", f"p{i}"),
+                Tasks(task for tasks in subplan.values() for task in tasks),
+                rng.choice([20, 40, 60]),
+                start + rng.randrange(30),
+                None,
+                1,
+                100,
+                30,
+            )
+            for i, subplan in enumerate(synthetic_subplans(start, 1, 12, 20, rng))
+        ]
+    )
+
+
+def test_parallel_subplans_match_serial() -> None:
+    start = NKDate(2024, 1, 1)
+    serialized = []
+    for parallel in (False, True):
+        projects = synthetic_projects(start, 0)
+        by_priority = list(projects.iter_by_priority)
+        if parallel:
+            subplans = projects.subplans(max_workers=2)
+            assert list(subplans) == [project.project_id for project in by_priority]
+            for project, subplan in zip(by_priority, subplans.values()):
+                tasks = [task for tasks_ in subplan.values() for task in tasks_]
+                assert all(task is project.tasks[task.task_id] for task in tasks)
+        else:
+            subplans = {project.project_id: project.subplan for project in by_priority}
+
+        plan = Plan(synthetic_calendar(start, 100, random.Random(1)))
+        for subplan in subplans.values():
+            plan = update_plan(plan, subplan)
+        serialized.append(json.dumps(plan.serialize()))
+
+    assert serialized[0] == serialized[1]
+
+
+def test_calendar_builds_days_lazily() -> None:
+    declaration_dir = TDataPaths.default_data_dir / "declaration"
+    with open(declaration_dir / "routines.json", encoding="utf-8") as f:
+        routines = Routines.deserialize(json.load(f))
+    with open(declaration_dir / "calendar.json", encoding="utf-8") as f:
+        calendar_dict = json.load(f)
+
+    calendar = Calendar.deserialize(routines, calendar_dict)
+    calendar.max_live_days = 3
+    dates = list(calendar)
+    assert [str(date) for date in dates] == list(calendar_dict)
+    assert calendar.start_date == min(dates) and calendar.end_date == max(dates)
+    assert not calendar._live_days
+
+    first_day = calendar[dates[0]]
+    assert calendar[dates[0]] is first_day
+    for date in dates[1:4]:
+        calendar[date]
+    assert list(calendar._live_days) == dates[1:4]
+
+    rebuilt = calendar[dates[0]]
+    assert rebuilt is not first_day
+    assert list(map(str, rebuilt.entries)) == list(map(str, first_day.entries))
+
+
+def test_routine_entries_share_templates() -> None:
+    declaration_dir = TDataPaths.default_data_dir / "declaration"
+    with open(declaration_dir / "routines.json", encoding="utf-8") as f:
+        routines = Routines.deserialize(json.load(f))
+    with open(declaration_dir / "calendar.json", encoding="utf-8") as f:
+        calendar = Calendar.deserialize(routines, json.load(f))
+
+    days = [calendar[date] for date in calendar]
+    entries = [entry for day in days for entry in day.routines]
+    assert len(routines._templates) < len(entries)
+
+    first, second = [e for e in entries if str(e) == str(entries[0])][:2]
+    assert first is not second and first.subentries is not second.subentries
+    assert first.categories is second.categories
+
+
+def test_calendar_recurring_days() -> None:
+    declaration_dir = TDataPaths.default_data_dir / "declaration"
+    with open(declaration_dir / "routines.json", encoding="utf-8") as f:
+        routines = Routines.deserialize(json.load(f))
+    with open(declaration_dir / "calendar.json", encoding="utf-8") as f:
+        calendar_dict = json.load(f)
+    first_date, day_dict = next(iter(calendar_dict.items()))
+    weekend_dict = {**day_dict, "entries": []}
+    calendar_dict = {
+        first_date: day_dict,
+        "recurring": [
+            {"start": "2024-01-01", "end": "2024-12-31", "day": day_dict},
+            {
+                "start": "2024-01-01",
+                "end": "2024-12-31",
+                "weekdays": ["Sat", "Sun"],
+                "except": ["2024-06-01"],
+                "day": weekend_dict,
+            },
+        ],
+    }
+
+    calendar = Calendar.deserialize(routines, calendar_dict)
+    assert len(calendar) == 1 + 366 and not calendar._live_days
+    assert list(calendar)[:2] == [NKDate.from_string(first_date), NKDate(2024, 1, 1)]
+    assert calendar.start_date == NKDate.from_string(first_date)
+    assert calendar.end_date == NKDate(2024, 12, 31)
+    assert NKDate(2025, 1, 1) not in calendar
+
+    assert calendar.day_dict(NKDate(2024, 6, 2)) is weekend_dict
+    assert calendar.day_dict(NKDate(2024, 6, 1)) is day_dict
+    assert calendar.day_dict(NKDate(2024, 6, 3)) is day_dict
+    weekend, weekday = calendar[NKDate(2024, 6, 2)], calendar[NKDate(2024, 6, 3)]
+    assert len(weekend.entries) == len(weekday.entries) - len(day_dict["entries"])
+
+
+def test_routine_valid_dates_per_horizon() -> None:
+    declaration_dir = TDataPaths.default_data_dir / "declaration"
+    with open(declaration_dir / "routines.json", encoding="utf-8") as f:
+        routines = Routines.deserialize(json.load(f))
+    with open(declaration_dir / "calendar.json", encoding="utf-8") as f:
+        day_dict = next(iter(json.load(f).values()))
+    routine = Routine(
+        "weekdays",
+        NKTime(7),
+        [],
+        priority=50,
+        notes="",
+        normaltime=30,
+        idealtime=30,
+        mintime=15,
+        maxtime=45,
+        ismovable=True,
+        order=0.0,
+        valid_dates=lambda date: date.weekday() < 5,
+    )
+    routines.add(routine)
+
+    def recurring(start: str, end: str) -> dict:
+        return {"recurring": [{"start": start, "end": end, "day": day_dict}]}
+
+    january = Calendar.deserialize(routines, recurring("2024-01-01", "2024-01-31"))
+    Calendar.deserialize(routines, recurring("2024-03-01", "2024-03-31"))
+
+    for date in chain(january, NKDate(2024, 3, 1).range(NKDate(2024, 6, 30))):
+        assert routine.valid_on(date) == (date.weekday() < 5)
+    assert callable(routine.valid_dates)
+    assert len(routine._compiled) == 2
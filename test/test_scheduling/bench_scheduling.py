@@ -0,0 +1,83 @@
+"""
+Benchmark of the priority-weighted compression of over-full days (`Schedule.compress`) on dense
+  synthetic days, compared with only admitting entries at their normal durations (by descending
+  priority) and carrying the rest over.
+
+Run with `python -m test.test_scheduling.bench_scheduling` from the repository root.
+"""
+
+import random
+import time
+
+# sets NEBOKRAI_ROOT_FILE before nebokrai is imported
+from .. import conftest  # noqa: F401
+
+# isort: split
+from nebokrai.entity import Entry, Occupancy, Schedule
+from nebokrai.util import NKDate, NKTime
+
+START = NKDate(2024, 1, 1)
+NDAYS = 3 * 365
+
+
+def synthetic_day(date: NKDate, nentries: int, rng: random.Random) -> tuple[Schedule, list, list]:
+    fixed = [
+        Entry("Sleep", NKTime(0), NKTime(7), ismovable=False),
+        Entry("Work", NKTime(9), NKTime(rng.choice([15, 16, 17])), ismovable=False),
+        Entry("Sleep", NKTime(23), NKTime(24), ismovable=False),
+    ]
+    flex = []
+    for i in range(nentries):
+        normaltime = rng.choice([30, 60, 90, 120])
+        flex.append(
+            Entry(
+                f"Task {i}",
+                None,
+                priority=rng.choice([10, 30, 50, 70, 90]),
+                normaltime=normaltime,
+                mintime=normaltime // 2,
+                maxtime=normaltime * 3 // 2,
+            )
+        )
+    return Schedule(date, fixed), flex, fixed
+
+
+def admit_at_normaltime(flex: list[Entry], fixed: list[Entry]) -> tuple[list, list]:
+    available = Occupancy(fixed).empty_time
+    kept, overflow = [], []
+    for entry in sorted(flex, key=lambda e: -e.priority):
+        if entry.normaltime <= available:
+            available -= entry.normaltime
+            kept.append(entry)
+        else:
+            overflow.append(entry)
+    return kept, overflow
+
+
+def run(compress: bool, nentries: int, seed: int = 0) -> tuple[float, int, int]:
+    rng = random.Random(seed)
+    days = [synthetic_day(date, nentries, rng) for date in START.range(NDAYS - 1)]
+    t0 = time.perf_counter()
+    placed, carried = 0, 0
+    for schedule, flex, fixed in days:
+        kept, overflow = (
+            schedule.compress(flex, fixed) if compress else admit_at_normaltime(flex, fixed)
+        )
+        placed += len(kept)
+        carried += len(overflow)
+    return time.perf_counter() - t0, placed, carried
+
+
+def main() -> None:
+    for nentries in [8, 16, 32]:
+        t_plain, placed_plain, carried_plain = run(False, nentries)
+        t_comp, placed_comp, carried_comp = run(True, nentries)
+        print(
+            f"{nentries:>3} entries/day   normal durations: {placed_plain:6d} placed, "
+            f"{carried_plain:6d} carried ({t_plain:6.3f}s)   compressed: {placed_comp:6d} placed, "
+            f"{carried_comp:6d} carried ({t_comp:6.3f}s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark of scheduling throughput: derives the schedules of synthetic calendars and plans day
+  by day (as `NebokraiEntryPoint.derive_schedules_iter` does) and reports days per second, along
+  with the `NKTime` operations that dominate the entry-level work.
+
+Run with `python -m test.test_scheduling.bench_throughput` from the repository root.
+"""
+
+import contextlib
+import io
+import time
+import timeit
+
+# sets NEBOKRAI_ROOT_FILE before nebokrai is imported
+from .. import conftest  # noqa: F401
+
+# isort: split
+from nebokrai.util import NKTime
+
+from .test_scheduling_end2end import synthetic_entry_point
+
+
+def time_ops(number: int = 100_000) -> None:
+    times = [NKTime.fromminutes(m) for m in range(0, 24 * 60, 7)]
+    pairs = list(zip(times, reversed(times)))
+    cases = {
+        "compare": lambda: [a < b for a, b in pairs],
+        "timeto": lambda: [a.timeto(b) for a, b in pairs],
+        "add": lambda: [a + 15 for a in times],
+        "construct": lambda: [NKTime(a.hour, a.minute) for a in times],
+    }
+    rounds = number // len(times)
+    for name, case in cases.items():
+        best = min(timeit.repeat(case, number=rounds, repeat=5)) / (rounds * len(times))
+        print(f"  {name:<10} {best * 1e9:8.1f} ns/op")
+
+
+def time_scheduling(seeds: range) -> None:
+    ndays, elapsed = 0, 0.0
+    for seed in seeds:
+        entry_point = synthetic_entry_point(seed)
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            ndays += sum(1 for _ in entry_point.derive_schedules_iter())
+            elapsed += time.perf_counter() - t0
+    print(f"  {ndays} days in {elapsed:.3f}s: {ndays / elapsed:8.1f} days/s")
+
+
+def main() -> None:
+    print("NKTime operations:")
+    time_ops()
+    print("Scheduling:")
+    time_scheduling(range(50))
+
+
+if __name__ == "__main__":
+    main()
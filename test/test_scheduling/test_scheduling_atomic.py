@@ -1,16 +1,20 @@
 from nebokrai import NebokraiEntryPoint
-from nebokrai.entity.base.entry import Entry
+from nebokrai.entity.base.entry import Empty, Entry
+from nebokrai.entity.base.occupancy import Occupancy
 from nebokrai.entity.base.plan import Plan
 from nebokrai.entity.base.schedule import (
     Schedule,
+    add_entries,
     add_from_plan_and_excess,
     add_to_blocks,
     assert_plan_and_date,
+    compress_durations,
     entries_from_plan_and_excess,
     zip_flex_and_fixed,
 )
 from nebokrai.entity.container.entries import Entries
 from nebokrai.util.nkdatetime.nkdate import NKDate
+from nebokrai.util.nkdatetime.nktime import NKTime
 
 from ..util import TDataPaths
 
@@ -36,13 +40,224 @@ def test_add_to_blocks() -> None:
     assert new_entries == new_entries_expected
 
 
+def test_add_to_blocks_uses_first_matching_block() -> None:
+    morning = Entry("morning", NKTime(8), NKTime(9), blocks={"admin"}, ismovable=False)
+    work = Entry("work", NKTime(9), NKTime(12), blocks={"work", "admin"}, ismovable=False)
+    schedule = Schedule(NKDate(2024, 1, 1), [morning, work])
+    email = Entry("email", None, normaltime=15, categories={"admin"})
+    report = Entry("report", None, normaltime=60, categories={"work"})
+    walk = Entry("walk", None, normaltime=30, categories={"outdoors"})
+    entries = Entries([email, report, walk])
+
+    schedule, entries = add_to_blocks(schedule, entries)
+
+    assert [e.name for e in morning.subentries] == ["email"]
+    assert [e.name for e in work.subentries] == ["report"]
+    assert [e.name for e in entries] == ["walk"]
+
+
+def test_Entry_add_subentries_evicts_lowest_priority() -> None:
+    block = Entry("work", NKTime(9), NKTime(10), blocks={"work"}, ismovable=False)
+    batch = [
+        Entry(name, None, priority=priority, normaltime=30, categories={"work"})
+        for name, priority in [("a", 50), ("b", 10), ("c", 90), ("d", 10)]
+    ]
+    excess = block.add_subentries(batch)
+
+    assert [e.name for e in excess] == ["d", "b"]
+    assert [e.name for e in block.subentries] == ["c", "a"]
+    assert [(e.start, e.end) for e in block.subentries] == [
+        (NKTime(9), NKTime(9, 30)),
+        (NKTime(9, 30), NKTime(10)),
+    ]
+
+
 def test_zip_flex_and_fixed() -> None:
     flex_entries = []
     fixed_entries = []
-    new_entries_expected = Entries()
-    new_entries = zip_flex_and_fixed(flex_entries, fixed_entries)
+    new_entries, overflow = zip_flex_and_fixed(flex_entries, fixed_entries)
 
-    assert new_entries == new_entries_expected
+    assert not new_entries
+    assert not overflow
+
+
+def test_Entries_insort_keeps_start_order() -> None:
+    entries = Entries()
+    for hour in [9, 7, 12, 8, 7]:
+        entries.insort(Entry(str(hour), start=NKTime(hour), end=NKTime(hour + 1)))
+
+    assert entries.isordered
+    assert [e.start for e in entries] == sorted(e.start for e in entries)
+    assert entries.start == NKTime(7)
+    assert entries.earliest_end == NKTime(13)
+
+    entries.append(Entry("6", start=NKTime(6), end=NKTime(7)))
+    assert not entries.isordered
+    assert entries.start == NKTime(6)
+
+
+def test_Entries_with_gaps() -> None:
+    entries = Entries(
+        [
+            Entry("a", start=NKTime(8), end=NKTime(9)),
+            Entry("b", start=NKTime(9), end=NKTime(10)),
+            Entry("c", start=NKTime(11), end=NKTime(12)),
+        ]
+    )
+    with_gaps = entries.with_gaps
+
+    assert [e.name for e in with_gaps] == ["a", "b", "Empty", "c"]
+    assert (with_gaps[2].start, with_gaps[2].end) == (NKTime(10), NKTime(11))
+
+
+def test_Entries_overlap_index() -> None:
+    morning = Entry("morning", start=NKTime(6), end=NKTime(12), ismovable=False)
+    lunch = Entry("lunch", start=NKTime(12), end=NKTime(13))
+    walk = Entry("walk", start=NKTime(12, 30), end=NKTime(14))
+    entries = Entries([walk, morning])
+    query = Entry("query", start=NKTime(11), end=NKTime(12, 45))
+
+    assert [e.name for e in entries.get_overlaps(query)] == ["morning", "walk"]
+    assert not entries.overlaps_are_movable(query)
+
+    entries.append(lunch)
+    entries.remove(morning)
+    assert [e.name for e in entries.get_overlaps(query)] == ["lunch", "walk"]
+    assert entries.overlaps_are_movable(query)
+    assert not entries.get_overlaps(Entry("late", start=NKTime(14), end=NKTime(15)))
+
+
+def test_Occupancy() -> None:
+    occupancy = Occupancy(
+        [
+            Entry("sleep", start=NKTime(0), end=NKTime(7), ismovable=False),
+            Entry("work", start=NKTime(9), end=NKTime(12)),
+            Empty(start=NKTime(12), end=NKTime(13)),
+            Entry("meeting", start=NKTime(13), end=NKTime(13, 30), ismovable=False),
+            Entry("sleep", start=NKTime(22), end=NKTime(24), ismovable=False),
+        ]
+    )
+
+    assert occupancy.empty_time == 2 * 60 + 60 + 8 * 60 + 30
+    assert list(occupancy.gaps())[:2] == [(NKTime(7), NKTime(9)), (NKTime(12), NKTime(13))]
+    assert occupancy.first_gap(60) == NKTime(7)
+    assert occupancy.first_gap(60, after=NKTime(8, 30)) == NKTime(12)
+    assert occupancy.first_gap(180, after=NKTime(8, 30)) == NKTime(13, 30)
+    assert occupancy.first_gap(10 * 60) is None
+    assert occupancy.is_free(NKTime(12), NKTime(13))
+    assert not occupancy.has_fixed(NKTime(9), NKTime(13))
+    assert occupancy.has_fixed(NKTime(9), NKTime(13, 1))
+
+
+def test_Schedule_occupancy_follows_entries() -> None:
+    schedule = Schedule(
+        NKDate(2024, 1, 1), [Entry("sleep", start=NKTime(0), end=NKTime(7), ismovable=False)]
+    )
+    assert schedule.empty_time == 17 * 60
+
+    schedule.schedule.insort(Entry("work", start=NKTime(9), end=NKTime(17), ismovable=False))
+    assert schedule.empty_time == 9 * 60
+    assert not schedule.can_be_added(Entry("call", start=NKTime(10), end=NKTime(11)))
+    assert schedule.can_be_added(Entry("call", start=NKTime(7), end=NKTime(8)))
+    assert [(gap.start, gap.end) for gap in schedule.schedule.gaps] == [(NKTime(7), NKTime(9))]
+
+    schedule.schedule.pop(0)
+    assert schedule.empty_time == 16 * 60
+    assert schedule.schedule.entry_list_fits()
+
+
+def test_Schedule_can_be_added_boundaries() -> None:
+    sleep = Entry("sleep", start=NKTime(0), end=NKTime(8), mintime=480, ismovable=False)
+    chores = Entry("chores", start=NKTime(8), end=NKTime(9), mintime=60)
+    schedule = Schedule(NKDate(2024, 1, 1), [sleep, chores])
+
+    assert schedule.can_be_added(Entry("call", start=NKTime(8, 30), end=NKTime(9, 30)))
+    assert not schedule.can_be_added(Entry("nap", start=NKTime(7, 30), end=NKTime(8, 30)))
+
+    rest = 24 * 60 - 480 - 60
+    assert schedule.can_be_added(Entry("x", start=NKTime(10), end=NKTime(11), mintime=rest - 1))
+    assert not schedule.can_be_added(Entry("x", start=NKTime(10), end=NKTime(11), mintime=rest))
+
+    schedule.schedule.insort(Entry("x", start=NKTime(10), end=NKTime(11), mintime=rest - 1))
+    assert schedule.schedule.entry_list_fits()
+    schedule.schedule.insort(Entry("y", start=NKTime(12), end=NKTime(13), mintime=1))
+    assert not schedule.schedule.entry_list_fits()
+
+
+def test_compress_durations() -> None:
+    normal, minimum, maximum = [60, 60, 60], [30, 30, 30], [90, 90, 90]
+
+    assert compress_durations(normal, minimum, maximum, [1, 1, 2], 150) == [48, 48, 54]
+    assert compress_durations(normal, minimum, maximum, [1, 1, 2], 210) == [67, 67, 75]
+    assert compress_durations(normal, minimum, maximum, [1, 1, 1], 60) == [30, 30, 30]
+    assert compress_durations(normal, [50, 30, 30], maximum, [1, 1, 1], 100) == [50, 30, 30]
+
+
+def test_Schedule_compress() -> None:
+    fixed = [Entry("sleep", start=NKTime(0), end=NKTime(22), ismovable=False)]
+    flex = [
+        Entry(f"task {i}", start=None, priority=priority, normaltime=60, mintime=30, maxtime=90)
+        for i, priority in enumerate([10, 90, 50, 70])
+    ]
+    schedule = Schedule(NKDate(2024, 1, 1), fixed)
+    kept, overflow = schedule.compress(list(flex), fixed)
+
+    assert [e.name for e in kept] == ["task 0", "task 1", "task 2", "task 3"]
+    assert not overflow
+    assert sum(e.normaltime for e in kept) <= 120
+    assert kept[1].normaltime >= kept[2].normaltime >= kept[0].normaltime
+
+    flex.append(Entry("task 4", start=None, priority=30, normaltime=60, mintime=30))
+    kept, overflow = schedule.compress(flex, fixed)
+    assert [e.name for e in overflow] == ["task 0"]
+
+
+def test_Schedule_compress_zero_weight() -> None:
+    fixed = [Entry("sleep", start=NKTime(0), end=NKTime(22, 30), ismovable=False)]
+    flex = [
+        Entry(f"task {i}", start=None, priority=priority, normaltime=60, mintime=30)
+        for i, priority in enumerate([0, 50])
+    ]
+    schedule = Schedule(NKDate(2024, 1, 1), fixed, weight_interval_min=0.0)
+    assert schedule.prio_weighting_function(0) == 0
+
+    kept, overflow = schedule.compress(list(flex), fixed)
+
+    assert not overflow
+    assert [e.normaltime for e in kept] == [30, 60]
+
+
+def test_zip_flex_and_fixed_copies_entries() -> None:
+    gap = Empty(NKTime(8), NKTime(9))
+    task = Entry("task", start=None, normaltime=60, mintime=30)
+    times = (task.start, task.end)
+    fixed = [Entry("work", start=NKTime(8, 30), end=NKTime(20), ismovable=False)]
+    new_entries, overflow = zip_flex_and_fixed([gap, task], fixed)
+
+    assert not overflow
+    assert all(entry is not gap and entry is not task for entry in new_entries)
+    assert (gap.start, gap.end) == (NKTime(8), NKTime(9))
+    assert (task.start, task.end) == times
+
+
+def test_add_entries_does_not_overlap() -> None:
+    routine = Entry("routine", start=NKTime(7), end=NKTime(7, 30), maxtime=60)
+    schedule = Schedule(
+        NKDate(2024, 1, 1),
+        [
+            Entry("sleep", start=NKTime(0), end=NKTime(7), ismovable=False),
+            routine,
+            Entry("work", start=NKTime(7, 30), end=NKTime(20), ismovable=False),
+        ],
+    )
+    tasks = [Entry(f"task {i}", start=None, normaltime=60, mintime=30) for i in range(6)]
+    schedule, overflow = add_entries(schedule, Entries(tasks))
+
+    entries = list(schedule.schedule)
+    assert all(a.end <= b.start for a, b in zip(entries, entries[1:]))
+    assert entries[-1].end <= NKTime(24)
+    assert len(entries) + len(overflow) == 3 + len(tasks)
+    assert (routine.start, routine.end, routine.normaltime) == (NKTime(7), NKTime(7, 30), 30)
 
 
 def test_assert_plan_and_date() -> None:
@@ -0,0 +1,43 @@
+import contextlib
+import io
+import random
+from types import SimpleNamespace
+
+from nebokrai import NebokraiEntryPoint
+from nebokrai.entity import Plan, Tasks
+from nebokrai.util import NKDate
+
+from ..util import synthetic_calendar, synthetic_subplans
+
+
+def synthetic_entry_point(seed: int) -> NebokraiEntryPoint:
+    rng = random.Random(seed)
+    start, ndays = NKDate(2024, 1, 1), 20
+    calendar = synthetic_calendar(start, ndays, rng)
+    plan = Plan(calendar)
+    for date in start.range(ndays - 1):
+        plan[date] = Tasks()
+    for subplan in synthetic_subplans(start, ndays, 12, 20, rng):
+        for date, tasks in subplan.items():
+            plan[date].extend(tasks)
+
+    entry_point = object.__new__(NebokraiEntryPoint)
+    entry_point.calendar = calendar
+    entry_point.plan = plan
+    entry_point.roadmaps = SimpleNamespace(start_date=start, end_date=start + (ndays - 1))
+    return entry_point
+
+
+def test_derive_schedules_iter__parallel() -> None:
+    with contextlib.redirect_stdout(io.StringIO()):
+        sequential = list(synthetic_entry_point(0).derive_schedules_iter())
+        # Two workers keep fewer days in flight than there are, so the window has to refill.
+        parallel = list(
+            synthetic_entry_point(0).derive_schedules_iter(parallel=True, max_workers=2)
+        )
+
+    assert any(schedule.overflow for _, schedule in sequential)
+    assert [date for date, _ in parallel] == [date for date, _ in sequential]
+    for (_, expected), (_, schedule) in zip(sequential, parallel):
+        assert schedule.serialize() == expected.serialize()
+        assert [e.name for e in schedule.overflow] == [e.name for e in expected.overflow]
@@ -0,0 +1,89 @@
+"""
+Benchmark of entity IDs for a declaration with tens of thousands of tasks: memory of the IDs
+  held by task containers, dict lookups keyed by IDs, parent lookups (`TaskID.project_id`) and
+  parsing from strings, compared with NamedTuple IDs rebuilt on each access (the former layout).
+
+Run with `python -m test.test_util.bench_entity_ids` from the repository root.
+"""
+
+import timeit
+import tracemalloc
+from typing import NamedTuple
+
+# sets NEBOKRAI_ROOT_FILE before nebokrai is imported
+from .. import conftest  # noqa: F401
+
+# isort: split
+from nebokrai.util import TaskID
+
+NPROJECTS = 200
+NTASKS = 250
+COPIES = 4  # e.g. task, plan, dependency and schedule references built separately
+
+
+class TupleProjectID(NamedTuple):
+    roadmap: str
+    project: str
+
+
+class TupleTaskID(NamedTuple):
+    roadmap: str
+    project: str
+    task: str
+
+    @classmethod
+    def from_string(cls, s: str) -> "TupleTaskID":
+        return cls(*s.split("-"))
+
+    @property
+    def project_id(self) -> TupleProjectID:
+        return TupleProjectID(self.roadmap, self.project)
+
+
+def codes() -> list[tuple[str, str, str]]:
+    return [(f"r{p % 5}", f"p{p}", f"t{t:04d}") for p in range(NPROJECTS) for t in range(NTASKS)]
+
+
+def measure_memory(make: type) -> int:
+    tracemalloc.start()
+    ids = [[make(*c) for c in codes()] for _ in range(COPIES)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del ids
+    return size
+
+
+def main(number: int = 5) -> None:
+    memory_tuples, memory_interned = measure_memory(TupleTaskID), measure_memory(TaskID)
+    task_codes = codes()
+    strings = ["-".join(c) for c in task_codes]
+    tuples, ids = [TupleTaskID(*c) for c in task_codes], [TaskID(*c) for c in task_codes]
+    tuple_dict, id_dict = dict.fromkeys(tuples, 0), dict.fromkeys(ids, 0)
+    tuple_lookups = [TupleTaskID.from_string(s) for s in strings]
+    id_lookups = [TaskID.from_string(s) for s in strings]
+
+    def best(case) -> float:
+        return min(timeit.repeat(case, number=number, repeat=5)) / number * 1e3
+
+    cases = {
+        "dict lookup": (
+            lambda: [tuple_dict[t] for t in tuple_lookups],
+            lambda: [id_dict[t] for t in id_lookups],
+        ),
+        "parent": (lambda: [t.project_id for t in tuples], lambda: [t.project_id for t in ids]),
+        "from_string": (
+            lambda: [TupleTaskID.from_string(s) for s in strings],
+            lambda: [TaskID.from_string(s) for s in strings],
+        ),
+    }
+    print(f"{len(task_codes)} task ids, {COPIES} references each:")
+    print(
+        f"  {'memory':<12} tuples {memory_tuples / 2**20:7.2f} MiB   "
+        f"interned {memory_interned / 2**20:7.2f} MiB"
+    )
+    for name, (tuple_case, id_case) in cases.items():
+        print(f"  {name:<12} tuples {best(tuple_case):7.2f} ms    interned {best(id_case):7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Micro-benchmark of the `NKDate` operations on the planning and scheduling hot paths
+  (construction, arithmetic, hashing as dict keys, comparison and sorting).
+
+Run with `python -m test.test_util.bench_nkdate` from the repository root.
+"""
+
+import random
+import timeit
+
+# sets NEBOKRAI_ROOT_FILE before nebokrai is imported
+from .. import conftest  # noqa: F401
+
+# isort: split
+from nebokrai.util import NKDate
+
+START = NKDate(2024, 1, 1)
+NDATES = 3 * 365
+
+
+def main(number: int = 20) -> None:
+    rng = random.Random(0)
+    dates = START.range(NDATES - 1)
+    shuffled = rng.sample(dates, len(dates))
+    by_date = {date: i for i, date in enumerate(dates)}
+    lookups = [date.copy() for date in shuffled]
+    strings = [str(date) for date in shuffled]
+
+    cases = {
+        "construct": lambda: [NKDate(d.year, d.month, d.day) for d in shuffled],
+        "from_string": lambda: [NKDate.from_string(s) for s in strings],
+        "add": lambda: [d + 7 for d in shuffled],
+        "range": lambda: list(START.range(NDATES - 1)),
+        "dict lookup": lambda: [by_date[d] for d in lookups],
+        "compare": lambda: [a < b for a, b in zip(shuffled, dates)],
+        "sort": lambda: sorted(shuffled),
+        "str": lambda: [str(d + 1) for d in shuffled],
+    }
+    for interned in [False, True]:
+        NKDate.set_interning(interned)
+        print(f"interning {'on' if interned else 'off'} ({NDATES} dates, best of 5 x {number}):")
+        for name, case in cases.items():
+            best = min(timeit.repeat(case, number=number, repeat=5)) / number
+            print(f"  {name:<12} {best * 1e3:8.3f} ms")
+    NKDate.set_interning(False)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
+import copy
+import pickle
+
 import pytest
 
-from nebokrai.util.entity_ids import ProjectID, RoadmapID, TaskID
+from nebokrai.util.entity_ids import ProjectID, RoadmapID, TaskID, registry
 
 
 def test_ids() -> None:
@@ -111,3 +114,35 @@ def test_ids() -> None:
         "TaskID.__contains__ only supports instances of RoadmapID, ProjectID, or TaskID, "
         f"not type '<class 'int'>' (value: '3')."
     )
+
+
+def test_interned_ids() -> None:
+    tkid = TaskID("rdmp", "prjct", "tsk")
+    assert tkid is TaskID("rdmp", "prjct", "tsk") is TaskID.from_string("rdmp-prjct-tsk")
+    assert tkid.project_id is ProjectID("rdmp", "prjct") is ProjectID.from_string("rdmp-prjct")
+    assert tkid.roadmap_id is tkid.project_id.roadmap_id is RoadmapID("rdmp")
+    assert tkid.parent() is tkid.project_id and RoadmapID("rdmp").parent() is None
+    assert registry[tkid.handle] is tkid
+    assert registry.parents[tkid.handle] == tkid.project_id.handle
+
+    assert tkid.key == ("rdmp", "prjct", "tsk") and hash(tkid) == tkid.handle == int(tkid)
+    assert {tkid: 1}[TaskID("rdmp", "prjct", "tsk")] == 1 and bool(registry[0])
+    assert tkid != int(tkid) and int(tkid) != tkid and tkid.handle not in {tkid}
+    assert tkid != ("rdmp", "prjct", "tsk") and RoadmapID("rdmp") != ("rdmp",)
+    assert f"{tkid}|{tkid: >16}|{tkid.project_id:<6}|" == (
+        "rdmp-prjct-tsk|  rdmp-prjct-tsk|rdmp-prjct|"
+    )
+    assert list(tkid) == ["rdmp", "prjct", "tsk"] and tkid[1] == "prjct" and len(tkid) == 3
+    assert TaskID(*tkid) is tkid and "<>".join(tkid) == "rdmp<>prjct<>tsk"
+    assert ProjectID("rdmp", "prjct") != RoadmapID("rdmp").task_id("prjct", "tsk")
+    assert sorted([tkid, ProjectID("rdmp", "prjct"), ProjectID("a", "b")]) == [
+        ProjectID("a", "b"),
+        ProjectID("rdmp", "prjct"),
+        tkid,
+    ]
+    assert pickle.loads(pickle.dumps(tkid)) is tkid and copy.deepcopy(tkid) is tkid
+
+    with pytest.raises(AssertionError):
+        TaskID.from_string("rdmp-prjct")
+    with pytest.raises(ValueError):
+        ProjectID.from_string("rdmp")
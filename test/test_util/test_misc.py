@@ -1,4 +1,8 @@
-from nebokrai.util import round5
+import os
+import subprocess
+import sys
+
+from nebokrai.util import round5, stable_hash
 
 
 def test_round5() -> None:
@@ -15,3 +19,25 @@ def test_round5() -> None:
     assert round5(-45.5) == -45
     assert round5(23) == 25
     assert round5(22.5) == 25
+
+
+def test_stable_hash() -> None:
+    assert stable_hash("Project A") == 6471916144671678024
+    assert stable_hash("a", 1) == 9331952569449725121
+    assert stable_hash("a", 1) != stable_hash("a1")
+    assert 0 <= stable_hash("") < 2**64
+
+
+def test_stable_hash_is_process_independent() -> None:
+    code = "from nebokrai.util import stable_hash; print(stable_hash('Project A'))"
+    outputs = {
+        subprocess.run(
+            [sys.executable, "-c", code],
+            env=os.environ | {"PYTHONHASHSEED": seed, "PYTHONPATH": os.pathsep.join(sys.path)},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        for seed in ("1", "2")
+    }
+    assert outputs == {str(stable_hash("Project A"))}
@@ -2,7 +2,7 @@ from datetime import date
 
 import pytest
 
-from nebokrai.util import NKDate
+from nebokrai.util import DateRange, NKDate
 from nebokrai.util.nkdatetime.nkdate import NoneDate
 
 
@@ -19,6 +19,18 @@ def test_from_string() -> None:
     assert NKDate(2020, 2, 2) == NKDate.from_string("2020-2-2") == NKDate.from_string("2020-02-02")
 
 
+def test_from_string_formats() -> None:
+    date1 = NKDate(2024, 3, 9)
+    for string in ["2024-03-09", "2024-3-9", "2024/03/09", "due 2024-03-09!", "2024-03-09T10:00"]:
+        assert NKDate.from_string(string) == date1
+    parsed = NKDate.from_string("2024-03-09")
+    assert parsed is not NKDate.from_string("2024-03-09")
+    assert (parsed.year, parsed.month, parsed.day) == (2024, 3, 9)
+    for invalid in ["2024-02-30", "1969-12-31", "2024-13-01"]:
+        with pytest.raises((ValueError, AssertionError)):
+            NKDate.from_string(invalid)
+
+
 def test_from_string_errors() -> None:
     with pytest.raises(TypeError) as excinfo:
         d1 = NKDate.from_string(3)  # type: ignore
@@ -86,7 +98,39 @@ def test_today_and_tomorrow() -> None:
 
 def test_hash() -> None:
     date1 = NKDate(2011, 11, 11)
-    assert hash(date1) == hash((2011, 11, 11))
+    assert hash(date1) == hash(NKDate.fromordinal(date1.toordinal())) == hash(date1.toordinal())
+    assert len({date1, NKDate(2011, 11, 11), date1 + 1 - 1, date1 + 1}) == 2
+
+
+def test_ordinal_arithmetic() -> None:
+    date1 = NKDate(2024, 2, 28)
+    assert date1.toordinal() == date(2024, 2, 28).toordinal()
+    assert (date1 + 1, date1 + 2, date1 - 59) == (
+        NKDate(2024, 2, 29),
+        NKDate(2024, 3, 1),
+        NKDate(2023, 12, 31),
+    )
+    later = date1 + 400
+    assert later._fields is None
+    assert (later.year, later.month, later.day) == (2025, 4, 3)
+    assert later.weekday() == date(2025, 4, 3).weekday() and str(later) == "2025-04-03"
+    assert later == date(2025, 4, 3)
+
+
+def test_interning() -> None:
+    try:
+        NKDate.set_interning()
+        date1 = NKDate.from_string("2024-05-01")
+        assert date1 is NKDate.from_string("2024-05-01") is NKDate(2024, 4, 30) + 1
+        assert date1.copy() is not date1 and date1.copy() == date1
+        with pytest.raises(AttributeError):
+            date1.day = 2
+        date2 = date1.copy()
+        date2.day = 2
+        assert (date1.day, date2.day) == (1, 2) and NKDate.from_string("2024-05-02") == date2
+    finally:
+        NKDate.set_interning(False)
+    assert NKDate.from_string("2024-05-01") is not NKDate.from_string("2024-05-01")
 
 
 def test_pretty() -> None:
@@ -122,6 +166,28 @@ def test_range() -> None:
     assert date2.range(date2) == date2.range(date3, inclusive=False) == [date2]
 
 
+def test_date_range() -> None:
+    start = NKDate(2024, 1, 1)
+    dates = start.range(NKDate(2124, 1, 1))
+    assert isinstance(dates, DateRange)
+    assert len(dates) == start.daysto(NKDate(2124, 1, 1)) + 1 == 36525
+    assert dates[0] == dates.first == start and dates[-1] == dates.last == NKDate(2124, 1, 1)
+    assert dates[366] == NKDate(2025, 1, 1) and dates.index(NKDate(2025, 1, 1)) == 366
+    assert NKDate(2050, 6, 1) in dates and NKDate(2023, 12, 31) not in dates
+    assert NoneDate() not in dates and "2050-06-01" not in dates
+
+    week = dates[:7]
+    assert isinstance(week, DateRange) and list(week) == list(start.range(6))
+    assert list(reversed(week)) == list(week)[::-1] == week[::-1]
+    assert week == tuple(week) and week != list(week)[1:]
+
+    backwards = NKDate(2024, 1, 7).range(start)
+    assert list(backwards) == list(reversed(week)) and backwards.first == NKDate(2024, 1, 7)
+    assert NKDate(2024, 1, 3) in backwards and backwards.index(NKDate(2024, 1, 3)) == 4
+    with pytest.raises(ValueError):
+        dates.index(NKDate(2023, 12, 31))
+
+
 def test_non3date() -> None:
     nd = NoneDate()
     assert nd == NKDate.nonedate()
@@ -119,3 +119,24 @@ def test_nonetime() -> None:
     assert not (other <= nt)
     assert not (other > nt)
     assert not (other >= nt)
+
+
+def test_shared_instances() -> None:
+    assert NKTime.fromminutes(90) is NKTime(1, 0) + 30 is NKTime(2, 0) - 30
+    assert NKTime.fromminutes(90) == NKTime(1, 30) and NKTime(1, 30).tominutes() == 90
+    assert NKTime(23) + 120 is NKTime.fromminutes(24 * 60) and NKTime(1) - 120 == NKTime(0)
+    assert NoneTime() is NoneTime() is NKTime.nonetime() is NKTime.from_string("None")
+    assert NKTime(10, 43).copy() == NKTime(10, 43)
+    with pytest.raises(ValueError):
+        NKTime.fromminutes(24 * 60 + 1)
+    with pytest.raises(AttributeError):
+        NKTime(10).hour = 11  # type: ignore
+
+
+def test_from_string_fast_path() -> None:
+    assert NKTime.from_string("09:05") is NKTime.from_string("9:05") is NKTime.fromminutes(545)
+    assert NKTime.from_string("24:00") == NKTime(24) and NKTime.from_string("1:75") == NKTime(2, 15)
+    assert NKTime.from_string("none") is NKTime.from_string("None") is NoneTime()
+    for bad in ["25:00", "xx:yy", "0930", "09:30:00"]:
+        with pytest.raises(ValueError):
+            NKTime.from_string(bad)
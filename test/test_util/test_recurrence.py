@@ -0,0 +1,32 @@
+from nebokrai.util import DateSet, NKDate, RecurrenceRule
+
+
+def test_dateset() -> None:
+    dates = DateSet(NKDate(2024, 1, 1), NKDate(2024, 1, 31), [NKDate(2024, 1, 5)])
+    dates.add(NKDate(2024, 1, 3))
+    assert list(dates) == [NKDate(2024, 1, 3), NKDate(2024, 1, 5)]
+    assert NKDate(2024, 1, 5) in dates and NKDate(2024, 1, 4) not in dates
+    assert NKDate(2023, 12, 31) not in dates and NKDate(2024, 2, 5) not in dates
+    assert (dates.start, dates.end, len(dates)) == (NKDate(2024, 1, 3), NKDate(2024, 1, 5), 2)
+    dates.discard(NKDate(2024, 1, 3))
+    assert list(dates) == [NKDate(2024, 1, 5)]
+    assert not DateSet.from_dates([]) and DateSet.from_dates([]).start is None
+
+
+def test_recurrence_rule_compile() -> None:
+    rule = RecurrenceRule.deserialize(
+        {
+            "start": "2024-01-01",
+            "end": "2024-03-31",
+            "weekdays": ["Mon", "Fri"],
+            "except": ["2024-01-05"],
+        }
+    )
+    dates = rule.compile()
+    expected = [d for d in NKDate(2024, 1, 1).range(NKDate(2024, 3, 31)) if rule.matches(d)]
+    assert list(dates) == expected
+    assert all(d.weekday() in (0, 4) for d in dates)
+    assert NKDate(2024, 1, 5) not in dates and NKDate(2024, 1, 12) in dates
+
+    monthly = RecurrenceRule(NKDate(2024, 1, 1), NKDate(2024, 12, 31), monthdays=[1, 15]).compile()
+    assert len(monthly) == 24 and monthly.end == NKDate(2024, 12, 15)
@@ -0,0 +1,35 @@
+import io
+import json
+
+import pytest
+
+from nebokrai.util.serde.serialization import dump_json_list
+
+ITEMS = [
+    {"date": "2024-01-01", "entries": [{"name": "Schlaf", "start": "00:00"}, {"name": "Ärger"}]},
+    {"date": "2024-01-02", "entries": [], "notes": "line\nbreak"},
+    [],
+    {},
+    3,
+]
+
+
+@pytest.mark.parametrize("items", [[], ITEMS[:1], ITEMS])
+def test_dump_json_list(items: list) -> None:
+    stream = io.StringIO()
+    dump_json_list(iter(items), stream)
+    assert stream.getvalue() == json.dumps(items, ensure_ascii=False, indent=4)
+
+
+def test_dump_json_list_is_lazy() -> None:
+    stream = io.StringIO()
+    written = []
+
+    def items():
+        for i in range(3):
+            written.append(stream.getvalue())
+            yield {"i": i}
+
+    dump_json_list(items(), stream)
+    assert written[0] == ""
+    assert written[2].count('"i"') == 2
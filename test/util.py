@@ -1,3 +1,4 @@
+import random
 import sys
 from dataclasses import dataclass
 from pathlib import Path
@@ -5,6 +6,8 @@ from typing import Any, Callable, Optional, Tuple, Union
 
 import pytest
 
+from nebokrai.entity import Calendar, Day, Entries, Entry, Task, Tasks
+from nebokrai.util import NKDate, NKTime, TaskID
 from nebokrai.util.elementary_types import TrackingActivityResponseType
 from nebokrai.util.prompt import prompt_any
 from nebokrai.util.prompt.prompt_config import PromptConfig
@@ -45,3 +48,43 @@ def prompt_helper(
     else:
         cap = capsys.readouterr()
         assert cap.out == expected_error_message
+
+
+def synthetic_calendar(start: NKDate, ndays: int, rng: random.Random) -> Calendar:
+    """
+    Builds a calendar of `ndays` days beginning on `start`, about half of which contain a
+      non-movable work entry blocking a randomly sized 'work' block.
+    """
+    days = []
+    for date in start.range(ndays - 1):
+        entries = Entries()
+        if rng.random() < 0.5:
+            work_end = NKTime(9, rng.choice([30, 60, 90]))
+            entries.append(Entry("Work", NKTime(9), work_end, blocks={"work"}, ismovable=False))
+        day_start, day_end = NKTime(rng.choice([5, 6, 7])), NKTime(rng.choice([10, 11, 12]))
+        days.append(Day(date, day_start, day_end, entries, Entries()))
+    return Calendar(days)
+
+
+def synthetic_subplans(
+    start: NKDate, ndays: int, nprojects: int, ntasks: int, rng: random.Random
+) -> list[dict[NKDate, Tasks]]:
+    """
+    Builds one subplan per project, with `ntasks` tasks scattered over the `ndays` days beginning
+      on `start`; about 30% of the tasks can be placed in the 'work' block.
+    """
+    subplans = []
+    for p in range(nprojects):
+        subplan: dict[NKDate, Tasks] = {}
+        for t in range(ntasks):
+            task = Task(
+                f"Task {t}",
+                f"Project {p}",
+                TaskID("syn", f"p{p}", f"t{t:04d}"),
+                rng.choice([10, 50, 90]),
+                rng.choice([30, 60, 90, 120]),
+                categories={"work"} if rng.random() < 0.3 else set(),
+            )
+            subplan.setdefault(start + rng.randrange(ndays), Tasks()).add(task)
+        subplans.append(dict(sorted(subplan.items())))
+    return subplans